@@ -13,9 +13,13 @@ class AgentState(BaseModel):
     status: str = "idle"
     messages: List[Dict[str, Any]] = Field(default_factory=list)
     memory: Dict[str, Any] = Field(default_factory=dict)
+    keep_messages: bool = True  # Off for long-lived shared agents so history does not grow per call
+    cache_max_entries: int = 128  # Size bound for the per-key result caches
     
     def add_message(self, role: str, content: Any):
         """Add a message to the agent's message history"""
+        if not self.keep_messages:
+            return
         self.messages.append({
             "role": role,
             "content": content,
@@ -31,6 +35,22 @@ class AgentState(BaseModel):
     def clear_messages(self):
         """Clear the agent's message history"""
         self.messages = []
+    
+    def get_cached(self, cache: Dict[str, Any], key: str, max_age: float) -> Any:
+        """Value cached under key if stored less than max_age seconds ago, else None"""
+        entry = cache.pop(key, None)
+        if entry is None or (datetime.now() - entry["cached_at"]).total_seconds() >= max_age:
+            return None
+        # Re-insert so dict order stays least to most recently used
+        cache[key] = entry
+        return entry["value"]
+    
+    def put_cached(self, cache: Dict[str, Any], key: str, value: Any):
+        """Cache value under key with its own timestamp, evicting least recently used entries"""
+        cache.pop(key, None)
+        cache[key] = {"value": value, "cached_at": datetime.now()}
+        while len(cache) > self.cache_max_entries:
+            cache.pop(next(iter(cache)), None)
 
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
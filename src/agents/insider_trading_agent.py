@@ -48,11 +48,10 @@ class InsiderTradingAgent(BaseAgent):
             cache_key = f"{symbol}_{lookback_days}"
             
             # Check if we have cached data that's still valid
-            if (cache_key in self.state.cached_data and 
-                self.state.last_cache_update and 
-                (datetime.now() - self.state.last_cache_update).total_seconds() < self.state.cache_duration):
+            cached = self.state.get_cached(self.state.cached_data, cache_key, self.state.cache_duration)
+            if cached is not None:
                 self.update_status("idle")
-                return {"status": "success", "data": self.state.cached_data[cache_key]}
+                return {"status": "success", "data": cached}
             
             # Fetch insider trading data
             self.state.add_message("system", f"Fetching insider trading data for {symbol}")
@@ -74,7 +73,7 @@ class InsiderTradingAgent(BaseAgent):
             }
             
             # Cache the result
-            self.state.cached_data[cache_key] = result
+            self.state.put_cached(self.state.cached_data, cache_key, result)
             self.state.last_cache_update = datetime.now()
             
             self.update_status("idle")
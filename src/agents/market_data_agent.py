@@ -105,10 +105,9 @@ class MarketDataAgent(BaseAgent):
         # Check if data is in cache and still valid
         cache_key = f"{symbol}_{start_date}_{end_date}_{interval}_{market}"
         
-        if (cache_key in self.state.cached_data and 
-            self.state.last_cache_update and 
-            (datetime.now() - self.state.last_cache_update).total_seconds() < self.state.cache_duration):
-            return self.state.cached_data[cache_key]
+        cached = self.state.get_cached(self.state.cached_data, cache_key, self.state.cache_duration)
+        if cached is not None:
+            return cached
         
         # If not in cache or expired, fetch new data
         try:
@@ -119,7 +118,7 @@ class MarketDataAgent(BaseAgent):
                 # Fallback to simple transformation
                 yahoo_symbol = self._transform_symbol_for_yahoo(symbol, market)
                 ticker = yf.Ticker(yahoo_symbol)
-                info = ticker.info
+                info = await asyncio.to_thread(getattr, ticker, "info")
             else:
                 ticker = yf.Ticker(yahoo_symbol)
             
@@ -129,8 +128,8 @@ class MarketDataAgent(BaseAgent):
             if not end_date:
                 end_date = datetime.now().strftime("%Y-%m-%d")
             
-            # Fetch historical data
-            hist = ticker.history(start=start_date, end=end_date, interval=interval)
+            # Fetch historical data off the event loop so concurrent fetches overlap
+            hist = await asyncio.to_thread(ticker.history, start=start_date, end=end_date, interval=interval)
             
             # Check if we got valid historical data
             if hist.empty:
@@ -157,7 +156,7 @@ class MarketDataAgent(BaseAgent):
             }
             
             # Cache the result
-            self.state.cached_data[cache_key] = result
+            self.state.put_cached(self.state.cached_data, cache_key, result)
             self.state.last_cache_update = datetime.now()
             
             return result
@@ -176,7 +175,7 @@ class MarketDataAgent(BaseAgent):
                 # Fallback to simple transformation
                 yahoo_symbol = self._transform_symbol_for_yahoo(symbol, market)
                 ticker = yf.Ticker(yahoo_symbol)
-                info = ticker.info
+                info = await asyncio.to_thread(getattr, ticker, "info")
             
             # Check if we have valid price data
             current_price = info.get("currentPrice") or info.get("regularMarketPrice")
@@ -259,7 +258,7 @@ class MarketDataAgent(BaseAgent):
         for format_symbol in formats_to_try:
             try:
                 ticker = yf.Ticker(format_symbol)
-                info = ticker.info
+                info = await asyncio.to_thread(getattr, ticker, "info")
                 
                 # Check if we got valid data
                 if info and (info.get('currentPrice') or info.get('regularMarketPrice')):
@@ -116,10 +116,9 @@ class NewsSentimentAgent(BaseAgent):
         # Check if data is in cache and still valid
         cache_key = f"{query}_{days}"
         
-        if (cache_key in self.state.cached_news and 
-            self.state.last_cache_update and 
-            (datetime.now() - self.state.last_cache_update).total_seconds() < self.state.cache_duration):
-            return self.state.cached_news[cache_key]
+        cached = self.state.get_cached(self.state.cached_news, cache_key, self.state.cache_duration)
+        if cached is not None:
+            return cached
         
         # If not in cache or expired, fetch new data
         try:
@@ -167,7 +166,7 @@ class NewsSentimentAgent(BaseAgent):
                 articles = self._generate_dummy_news(query, days)
             
             # Cache the result
-            self.state.cached_news[cache_key] = articles
+            self.state.put_cached(self.state.cached_news, cache_key, articles)
             self.state.last_cache_update = datetime.now()
             
             return articles
@@ -1,9 +1,12 @@
 from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 import ta
 from pydantic import BaseModel, Field
 
@@ -11,7 +14,7 @@ from src.agents.base_agent import BaseAgent, AgentState
 from src.agents.market_data_agent import MarketDataAgent
 from src.utils.advanced_indicators import (
     calculate_all_indicators,
-    calculate_bollinger_bands,
+    bollinger_band_arrays,
     calculate_ichimoku_cloud,
     calculate_atr,
     calculate_stochastic,
@@ -22,6 +25,24 @@ from src.utils.advanced_indicators import (
     detect_cup_and_handle,
     detect_flag_pennant
 )
+from src.utils.indicator_kernels import compute_rsi_wilder, rolling_mean
+
+# TA-Lib is optional; its C implementations are used for RSI/MACD/ATR/Stochastic when installed
+try:
+    import talib
+    TALIB_AVAILABLE = True
+except ImportError:
+    TALIB_AVAILABLE = False
+
+# Worker threads for the pattern detectors; their NumPy work releases the GIL
+# so detection overlaps the indicator pass running on the event loop thread
+PATTERN_DETECTORS = (
+    ("head_and_shoulders", detect_head_and_shoulders),
+    ("double_pattern", detect_double_top_bottom),
+    ("cup_and_handle", detect_cup_and_handle),
+    ("flag_pennant", detect_flag_pennant),
+)
+_PATTERN_EXECUTOR = ThreadPoolExecutor(max_workers=min(len(PATTERN_DETECTORS), os.cpu_count() or 1))
 
 class TechnicalAnalysisState(AgentState):
     """State for the technical analysis agent"""
@@ -79,9 +100,9 @@ class TechnicalAnalysisAgent(BaseAgent):
             
             df = pd.DataFrame(historical_data)
             
-            # Ensure date column is datetime
-            if "Date" in df.columns:
-                df["Date"] = pd.to_datetime(df["Date"])
+            # Ensure date column is datetime, skipping the parse when it already is
+            if "Date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+                df["Date"] = pd.to_datetime(df["Date"], format="ISO8601", cache=True)
             
             # Perform technical analysis
             self.state.add_message("system", "Performing technical analysis")
@@ -92,14 +113,21 @@ class TechnicalAnalysisAgent(BaseAgent):
                 if len(df) < 60:
                     self.state.add_message("system", "Warning: Limited data available for pattern detection")
             
-            # Perform analysis based on requested indicators
-            analysis_results = await self.analyze_data(df, indicators)
-            
-            # Detect patterns if requested
+            # Perform analysis based on requested indicators, detecting patterns
+            # concurrently when requested; detection is started first so its
+            # worker threads run while the indicators are computed
             patterns = {}
             if "patterns" in indicators:
+                # Normalise the columns before the detector threads start reading df,
+                # so analyze_data never inserts columns while they run
+                self._ensure_price_columns(df)
                 self.state.add_message("system", "Detecting chart patterns")
-                patterns = await self.detect_patterns(df)
+                patterns, analysis_results = await asyncio.gather(
+                    self.detect_patterns(df),
+                    self.analyze_data(df, indicators)
+                )
+            else:
+                analysis_results = await self.analyze_data(df, indicators)
             
             # Generate signals
             self.state.add_message("system", "Generating signals")
@@ -116,7 +144,7 @@ class TechnicalAnalysisAgent(BaseAgent):
             
             # Cache the result
             cache_key = f"{symbol}_{interval}_{period}"
-            self.state.cached_analysis[cache_key] = result
+            self.state.put_cached(self.state.cached_analysis, cache_key, result)
             self.state.last_cache_update = datetime.now()
             
             self.update_status("idle")
@@ -211,11 +239,8 @@ class TechnicalAnalysisAgent(BaseAgent):
         self.update_status("idle")
         return result
     
-    async def analyze_data(self, df: pd.DataFrame, indicators: List[str]) -> Dict[str, Any]:
-        """Perform technical analysis on the data"""
-        results = {}
-        
-        # Ensure we have the necessary columns
+    def _ensure_price_columns(self, df: pd.DataFrame):
+        """Add any missing OHLCV column from its lowercase variant, in place"""
         required_columns = ["Open", "High", "Low", "Close", "Volume"]
         for col in required_columns:
             if col not in df.columns:
@@ -225,82 +250,123 @@ class TechnicalAnalysisAgent(BaseAgent):
                     df[col] = df[lower_col]
                 else:
                     raise ValueError(f"Required column {col} not found in data")
+    
+    async def analyze_data(self, df: pd.DataFrame, indicators: List[str]) -> Dict[str, Any]:
+        """Perform technical analysis on the data"""
+        results = {}
+        
+        # Ensure we have the necessary columns
+        self._ensure_price_columns(df)
+        
+        # Convert the price columns once and share the arrays across indicators
+        high_arr = df["High"].to_numpy(dtype=np.float64)
+        low_arr = df["Low"].to_numpy(dtype=np.float64)
+        close_arr = df["Close"].to_numpy(dtype=np.float64)
         
         # Calculate Simple Moving Averages
         if "sma" in indicators:
-            results["sma"] = {
-                "sma_20": df["Close"].rolling(window=20).mean().iloc[-1],
-                "sma_50": df["Close"].rolling(window=50).mean().iloc[-1],
-                "sma_200": df["Close"].rolling(window=200).mean().iloc[-1]
-            }
+            if TALIB_AVAILABLE:
+                results["sma"] = {
+                    f"sma_{window}": talib.SMA(close_arr, timeperiod=window)[-1]
+                    for window in (20, 50, 200)
+                }
+            else:
+                results["sma"] = {
+                    f"sma_{window}": rolling_mean(close_arr, window)[-1]
+                    for window in (20, 50, 200)
+                }
         
         # Calculate Exponential Moving Averages
         if "ema" in indicators:
             results["ema"] = {
-                "ema_12": df["Close"].ewm(span=12, adjust=False).mean().iloc[-1],
-                "ema_26": df["Close"].ewm(span=26, adjust=False).mean().iloc[-1],
-                "ema_50": df["Close"].ewm(span=50, adjust=False).mean().iloc[-1]
+                "ema_12": df["Close"].ewm(span=12, adjust=False).mean().iat[-1],
+                "ema_26": df["Close"].ewm(span=26, adjust=False).mean().iat[-1],
+                "ema_50": df["Close"].ewm(span=50, adjust=False).mean().iat[-1]
             }
         
         # Calculate RSI
         if "rsi" in indicators:
-            rsi = ta.momentum.RSIIndicator(df["Close"], window=14)
+            if TALIB_AVAILABLE:
+                rsi_14 = talib.RSI(close_arr, timeperiod=14)[-1]
+            else:
+                rsi_14 = compute_rsi_wilder(close_arr, 14)[-1]
             results["rsi"] = {
-                "rsi_14": rsi.rsi().iloc[-1]
+                "rsi_14": rsi_14
             }
         
         # Calculate MACD
         if "macd" in indicators:
-            macd = ta.trend.MACD(df["Close"])
-            results["macd"] = {
-                "macd_line": macd.macd().iloc[-1],
-                "signal_line": macd.macd_signal().iloc[-1],
-                "histogram": macd.macd_diff().iloc[-1]
-            }
+            if TALIB_AVAILABLE:
+                macd_line, signal_line, histogram = talib.MACD(close_arr, fastperiod=12, slowperiod=26, signalperiod=9)
+                results["macd"] = {
+                    "macd_line": macd_line[-1],
+                    "signal_line": signal_line[-1],
+                    "histogram": histogram[-1]
+                }
+            else:
+                macd = ta.trend.MACD(df["Close"])
+                results["macd"] = {
+                    "macd_line": macd.macd().iat[-1],
+                    "signal_line": macd.macd_signal().iat[-1],
+                    "histogram": macd.macd_diff().iat[-1]
+                }
         
         # Calculate Bollinger Bands
         if "bollinger" in indicators:
-            temp_df = calculate_bollinger_bands(df.copy())
+            bb_mid, bb_high, bb_low = bollinger_band_arrays(close_arr)
+            band_range = bb_high[-1] - bb_low[-1]
             results["bollinger"] = {
-                "upper_band": temp_df['bb_high'].iloc[-1],
-                "middle_band": temp_df['bb_mid'].iloc[-1],
-                "lower_band": temp_df['bb_low'].iloc[-1],
-                "width": temp_df['bb_width'].iloc[-1],
-                "percent_b": temp_df['bb_pct_b'].iloc[-1]
+                "upper_band": bb_high[-1],
+                "middle_band": bb_mid[-1],
+                "lower_band": bb_low[-1],
+                "width": band_range / bb_mid[-1] * 100,
+                "percent_b": (close_arr[-1] - bb_low[-1]) / band_range if band_range != 0 else np.nan
             }
         
         # Calculate Ichimoku Cloud
         if "ichimoku" in indicators:
             temp_df = calculate_ichimoku_cloud(df.copy())
             results["ichimoku"] = {
-                "tenkan_sen": temp_df['ichimoku_conversion_line'].iloc[-1],
-                "kijun_sen": temp_df['ichimoku_base_line'].iloc[-1],
-                "senkou_span_a": temp_df['ichimoku_a'].iloc[-1],
-                "senkou_span_b": temp_df['ichimoku_b'].iloc[-1],
-                "chikou_span": temp_df['ichimoku_lagging_line'].iloc[-26] if len(temp_df) > 26 else None
+                "tenkan_sen": temp_df['ichimoku_conversion_line'].iat[-1],
+                "kijun_sen": temp_df['ichimoku_base_line'].iat[-1],
+                "senkou_span_a": temp_df['ichimoku_a'].iat[-1],
+                "senkou_span_b": temp_df['ichimoku_b'].iat[-1],
+                "chikou_span": temp_df['ichimoku_lagging_line'].iat[-26] if len(temp_df) > 26 else None
             }
         
         # Calculate ATR
         if "atr" in indicators:
-            temp_df = calculate_atr(df.copy())
+            if TALIB_AVAILABLE:
+                atr_14 = talib.ATR(high_arr, low_arr, close_arr, timeperiod=14)[-1]
+            else:
+                atr_14 = calculate_atr(df.copy())['atr'].iat[-1]
             results["atr"] = {
-                "atr_14": temp_df['atr'].iloc[-1]
+                "atr_14": atr_14
             }
         
         # Calculate Stochastic Oscillator
         if "stochastic" in indicators:
-            temp_df = calculate_stochastic(df.copy())
-            results["stochastic"] = {
-                "k_value": temp_df['stoch_k'].iloc[-1],
-                "d_value": temp_df['stoch_d'].iloc[-1]
-            }
+            if TALIB_AVAILABLE:
+                # Fast %K (no K smoothing) with a 3-period SMA %D, as in calculate_stochastic
+                stoch_k, stoch_d = talib.STOCH(high_arr, low_arr, close_arr, fastk_period=14,
+                                               slowk_period=1, slowk_matype=0, slowd_period=3, slowd_matype=0)
+                results["stochastic"] = {
+                    "k_value": stoch_k[-1],
+                    "d_value": stoch_d[-1]
+                }
+            else:
+                temp_df = calculate_stochastic(df.copy())
+                results["stochastic"] = {
+                    "k_value": temp_df['stoch_k'].iat[-1],
+                    "d_value": temp_df['stoch_d'].iat[-1]
+                }
         
         # Calculate Parabolic SAR
         if "psar" in indicators:
             temp_df = calculate_parabolic_sar(df.copy())
             results["psar"] = {
-                "psar_value": temp_df['psar'].iloc[-1],
-                "trend": "Uptrend" if temp_df['psar_up_indicator'].iloc[-1] else "Downtrend"
+                "psar_value": temp_df['psar'].iat[-1],
+                "trend": "Uptrend" if temp_df['psar_up_indicator'].iat[-1] else "Downtrend"
             }
         
         # Calculate Fibonacci Levels
@@ -321,25 +387,15 @@ class TechnicalAnalysisAgent(BaseAgent):
         """Detect chart patterns using the advanced pattern recognition functions"""
         patterns = {}
         
-        # Detect head and shoulders pattern
-        h_and_s = detect_head_and_shoulders(df)
-        if h_and_s.get("detected", False):
-            patterns["head_and_shoulders"] = h_and_s
-        
-        # Detect double top/bottom
-        double_pattern = detect_double_top_bottom(df)
-        if double_pattern.get("detected", False):
-            patterns["double_pattern"] = double_pattern
-        
-        # Detect cup and handle
-        cup_handle = detect_cup_and_handle(df)
-        if cup_handle.get("detected", False):
-            patterns["cup_and_handle"] = cup_handle
-        
-        # Detect flag/pennant
-        flag_pennant = detect_flag_pennant(df)
-        if flag_pennant.get("detected", False):
-            patterns["flag_pennant"] = flag_pennant
+        # Run the detectors on worker threads and collect the ones that matched
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(_PATTERN_EXECUTOR, detector, df)
+            for _, detector in PATTERN_DETECTORS
+        ))
+        for (name, _), result in zip(PATTERN_DETECTORS, results):
+            if result.get("detected", False):
+                patterns[name] = result
         
         # Add a summary of detected patterns
         detected_patterns = [k for k, v in patterns.items() if v.get("detected", False)]
@@ -355,7 +411,7 @@ class TechnicalAnalysisAgent(BaseAgent):
         signals = {}
         
         # Current price
-        current_price = df["Close"].iloc[-1]
+        current_price = df["Close"].iat[-1]
         
         # Moving Average signals
         if "sma" in analysis_results and "ema" in analysis_results:
@@ -582,19 +638,18 @@ class TechnicalAnalysisAgent(BaseAgent):
     
     def _find_peaks(self, data: np.ndarray, window: int = 5) -> List[int]:
         """Find peaks (local maxima) in the data"""
-        peaks = []
-        for i in range(window, len(data) - window):
-            if data[i] == max(data[i-window:i+window+1]):
-                peaks.append(i)
-        return peaks
+        if len(data) <= 2 * window:
+            return []
+        # One np.max over every centred window view instead of a Python max per bar
+        window_max = sliding_window_view(data, 2 * window + 1).max(axis=1)
+        return (np.flatnonzero(data[window:len(data) - window] == window_max) + window).tolist()
     
     def _find_troughs(self, data: np.ndarray, window: int = 5) -> List[int]:
         """Find troughs (local minima) in the data"""
-        troughs = []
-        for i in range(window, len(data) - window):
-            if data[i] == min(data[i-window:i+window+1]):
-                troughs.append(i)
-        return troughs
+        if len(data) <= 2 * window:
+            return []
+        window_min = sliding_window_view(data, 2 * window + 1).min(axis=1)
+        return (np.flatnonzero(data[window:len(data) - window] == window_min) + window).tolist()
     
     def _filter_levels(self, levels: List[float], threshold: float = 0.01) -> List[float]:
         """Filter out levels that are too close to each other"""
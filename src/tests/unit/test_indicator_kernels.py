@@ -0,0 +1,119 @@
+"""
+Unit tests for the fused indicator kernels against pandas rolling/ewm.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.advanced_indicators import bollinger_band_arrays
+from src.utils.indicator_kernels import compute_price_indicators, compute_rsi_wilder
+
+
+def _wilder_rsi_reference(close, period=14):
+    """Wilder RSI built from pandas: NaN changes dropped, simple-mean seed, then ewm smoothing"""
+    delta = pd.Series(close).diff().dropna()
+    
+    def smooth(values):
+        seeded = values.iloc[period - 1:].copy()
+        seeded.iloc[0] = values.iloc[:period].mean()
+        return seeded.ewm(alpha=1 / period, adjust=False).mean()
+    
+    avg_gain = smooth(delta.clip(lower=0))
+    avg_loss = smooth((-delta).clip(lower=0))
+    rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    # The last value carries over bars whose change was dropped
+    return rsi.reindex(range(len(close))).ffill().to_numpy()
+
+
+def _assert_matches(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=np.float64), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+class TestFusedPriceIndicators:
+    """The fused kernel must match the pandas baseline, including around NaN closes."""
+    
+    @pytest.fixture(params=["clean", "nan_gaps"])
+    def close(self, request):
+        """Random-walk closes, optionally with NaN bars at the start, middle and in a run"""
+        rng = np.random.default_rng(7)
+        close = 100 + np.cumsum(rng.normal(size=400))
+        if request.param == "nan_gaps":
+            close[0] = np.nan
+            close[100] = np.nan
+            close[230:233] = np.nan
+        return close
+    
+    @pytest.fixture
+    def indicators(self, close):
+        return compute_price_indicators(close)
+    
+    def test_ma20_and_bands_match_pandas_rolling(self, close, indicators):
+        rolling = pd.Series(close).rolling(20)
+        mean = rolling.mean()
+        std = rolling.std()
+        _assert_matches(indicators["MA20"], mean)
+        _assert_matches(indicators["BB_Middle"], mean)
+        _assert_matches(indicators["BB_Upper"], mean + 2 * std)
+        _assert_matches(indicators["BB_Lower"], mean - 2 * std)
+    
+    def test_long_moving_averages_match_pandas_rolling(self, close, indicators):
+        series = pd.Series(close)
+        _assert_matches(indicators["MA50"], series.rolling(50).mean())
+        _assert_matches(indicators["MA200"], series.rolling(200).mean())
+    
+    def test_emas_and_macd_match_pandas_ewm(self, close, indicators):
+        series = pd.Series(close)
+        ema12 = series.ewm(span=12, adjust=False).mean()
+        ema26 = series.ewm(span=26, adjust=False).mean()
+        macd = ema12 - ema26
+        signal = macd.ewm(span=9, adjust=False).mean()
+        _assert_matches(indicators["EMA12"], ema12)
+        _assert_matches(indicators["EMA26"], ema26)
+        _assert_matches(indicators["MACD"], macd)
+        _assert_matches(indicators["Signal"], signal)
+        _assert_matches(indicators["Histogram"], macd - signal)
+    
+    def test_rsi_matches_wilder_reference(self, close, indicators):
+        _assert_matches(indicators["RSI"], _wilder_rsi_reference(close))
+    
+    def test_single_nan_does_not_poison_later_bars(self):
+        # Long enough that the NaN has left even the 200-bar window by the last 50 bars
+        close = 100 + np.cumsum(np.random.default_rng(3).normal(size=400))
+        close[100] = np.nan
+        indicators = compute_price_indicators(close)
+        for column, values in indicators.items():
+            assert not np.isnan(values[-50:]).any(), column
+
+
+class TestComputeRsiWilder:
+    """The standalone RSI must agree with the Wilder reference and the fused kernel."""
+    
+    def test_nan_closes_are_skipped(self):
+        close = 100 + np.cumsum(np.random.default_rng(5).normal(size=300))
+        close[100] = np.nan
+        close[200:202] = np.nan
+        rsi = compute_rsi_wilder(close)
+        _assert_matches(rsi, _wilder_rsi_reference(close))
+        _assert_matches(rsi, compute_price_indicators(close, ("rsi",))["RSI"])
+        assert not np.isnan(rsi[-50:]).any()
+    
+    def test_short_series_is_all_nan(self):
+        assert np.isnan(compute_rsi_wilder(np.arange(14, dtype=np.float64))).all()
+
+
+class TestBollingerBandArrays:
+    """bollinger_band_arrays uses population std, like ta.BollingerBands."""
+    
+    def test_matches_pandas_rolling_with_nan_gaps(self):
+        close = 100 + np.cumsum(np.random.default_rng(11).normal(size=300))
+        close[50] = np.nan
+        close[180:183] = np.nan
+        rolling = pd.Series(close).rolling(20)
+        mean = rolling.mean()
+        std = rolling.std(ddof=0)
+        mid, high, low = bollinger_band_arrays(close)
+        _assert_matches(mid, mean)
+        _assert_matches(high, mean + 2 * std)
+        _assert_matches(low, mean - 2 * std)
+        assert not np.isnan(mid[-50:]).any()
@@ -4,11 +4,22 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 import asyncio
+import bisect
+import logging
+import threading
+import zlib
+from collections import defaultdict
 from datetime import datetime, timedelta
+from dataclasses import dataclass
 
-from src.agents.market_data_agent import MarketDataAgent
 from src.agents.news_sentiment_agent import NewsSentimentAgent
 from src.agents.technical_analysis_agent import TechnicalAnalysisAgent
+from src.utils.advanced_indicators import bollinger_band_arrays, ichimoku_arrays
+from src.utils.indicator_kernels import compute_price_indicators
+from src.utils.downsampling import lttb_indices
+from src.utils.numba_compat import NUMBA_AVAILABLE
+from src.ui.event_loop import run_async
+from src.ui.shared_agents import get_market_data_agent, without_history
 
 # Try to import AI analysis agent
 try:
@@ -17,6 +28,8 @@ try:
 except ImportError:
     AI_ANALYSIS_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 # Enhanced color scheme for better visual appeal
 CHART_COLORS = {
     'primary': '#00d2ff',
@@ -33,94 +46,319 @@ CHART_COLORS = {
     'text': '#e2e8f0'
 }
 
+# Volume bar colors for up/down sessions
+VOLUME_UP_COLOR = 'rgba(16, 185, 129, 0.6)'
+VOLUME_DOWN_COLOR = 'rgba(239, 68, 68, 0.6)'
+
+# Moving average overlays: (column, legend name, color, dash style)
+MOVING_AVERAGE_TRACES = (
+    ("MA20", "MA 20", CHART_COLORS['warning'], 'solid'),
+    ("MA50", "MA 50", CHART_COLORS['success'], 'dash'),
+    ("MA200", "MA 200", CHART_COLORS['danger'], 'dot'),
+    ("EMA12", "EMA 12", CHART_COLORS['teal'], 'dashdot'),
+    ("EMA26", "EMA 26", CHART_COLORS['pink'], 'dashdot')
+)
+
+# Chart pattern messages: (pattern key, field selecting the message, {field value: (st level, title, description)})
+_BULLISH_REVERSAL = "This is typically a bullish reversal pattern suggesting a potential uptrend."
+_BEARISH_REVERSAL = "This is typically a bearish reversal pattern suggesting a potential downtrend."
+_BULLISH_CONTINUATION = "This is typically a bullish continuation pattern suggesting a potential uptrend continuation."
+_BEARISH_CONTINUATION = "This is typically a bearish continuation pattern suggesting a potential downtrend continuation."
+PATTERN_MESSAGES = (
+    ("head_and_shoulders", "pattern_type", {
+        "head_and_shoulders": ("warning", "Head and Shoulders Pattern Detected", _BEARISH_REVERSAL),
+        "inverse_head_and_shoulders": ("success", "Inverse Head and Shoulders Pattern Detected", _BULLISH_REVERSAL)
+    }),
+    ("double_pattern", "pattern_type", {
+        "double_top": ("warning", "Double Top Pattern Detected", _BEARISH_REVERSAL),
+        "double_bottom": ("success", "Double Bottom Pattern Detected", _BULLISH_REVERSAL)
+    }),
+    ("cup_and_handle", None, {
+        None: ("success", "Cup and Handle Pattern Detected", _BULLISH_CONTINUATION)
+    }),
+    ("flag_pennant", "direction", {
+        "bullish": ("success", "Bullish {kind} Pattern Detected", _BULLISH_CONTINUATION),
+        "bearish": ("warning", "Bearish {kind} Pattern Detected", _BEARISH_CONTINUATION)
+    })
+)
+
+# Preset time ranges and their length in days
+RANGE_DAYS = {
+    "1 Month": 30,
+    "3 Months": 90,
+    "6 Months": 180,
+    "1 Year": 365,
+    "2 Years": 730,
+    "5 Years": 1825
+}
+
+# Symbols offered in the sidebar quick-select picker
+POPULAR_SYMBOLS = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "META"]
+
+# Line traces longer than this are downsampled with LTTB before plotting
+LTTB_MAX_POINTS = 2000
+
+# Lifetime (seconds) of the cached price fetches
+PRICE_CACHE_TTL = 300
+
+# Price fields kept from the market agent's history records
+HISTORY_PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Placeholder risk metrics shown on the Risk Metrics tab
+RISK_METRICS = pd.DataFrame({
+    "Metric": [
+        "Beta", "Alpha (1Y)", "R-Squared", "Sharpe Ratio", "Treynor Ratio",
+        "Standard Deviation (1Y)", "Max Drawdown (1Y)", "VaR (95%, 1D)", "Sortino Ratio", "Information Ratio"
+    ],
+    "Value": ["1.23", "5.67%", "0.85", "1.45", "8.92", "22.4%", "-18.3%", "-2.8%", "1.82", "0.76"],
+}).set_index("Metric")
+
+# Per-percent portfolio impact of the allocation slider, with display units
+ALLOCATION_IMPACTS = pd.DataFrame({
+    "Metric": ["Portfolio Beta Change", "Expected Return Impact", "Volatility Impact", "Sharpe Ratio Impact"],
+    "Rate": [0.02, 0.05, 0.03, 0.01],
+    "Unit": ["", "%", "%", ""],
+}).set_index("Metric")
+
+# Heading color for the overall technical signal
+SIGNAL_COLORS = {
+    "Strong Buy": "green",
+    "Buy": "lightgreen",
+    "Neutral": "gray",
+    "Sell": "lightcoral",
+    "Strong Sell": "red"
+}
+
+# Summary table cell background per indicator signal, light gray otherwise
+SIGNAL_BACKGROUNDS = {
+    "Strong Buy": "lightgreen",
+    "Buy": "lightgreen",
+    "Sell": "lightcoral",
+    "Strong Sell": "lightcoral"
+}
+
+# Display formats for the numeric peer comparison columns
+PEER_TABLE_FORMATS = {
+    "P/E Ratio": "{:.2f}",
+    "Dividend Yield": "{:.2f}%",
+    "Market Cap ($B)": "${:.1f}B"
+}
+
+# Technical analysis views; only the selected one is computed and rendered
+TECHNICAL_VIEWS = ("📈 Price & Volume", "📊 Moving Averages", "⚡ Oscillators", "🤖 AI Analysis")
+
+# Lookback (days) and indicators for the technical analysis summary
+SUMMARY_PERIOD = 100
+SUMMARY_INDICATORS = ("sma", "ema", "rsi", "macd", "bollinger", "stochastic", "ichimoku")
+
+# Summary table rows as (signals key, field holding the signal, display name)
+INDICATOR_SIGNALS = (
+    ("moving_averages", "trend", "Moving Averages"),
+    ("rsi", "signal", "RSI"),
+    ("macd", "signal", "MACD"),
+    ("bollinger", "signal", "Bollinger Bands"),
+    ("stochastic", "signal", "Stochastic"),
+    ("ichimoku", "signal", "Ichimoku Cloud"),
+    ("psar", "signal", "Parabolic SAR"),
+)
+
+# News article sections as (label, sentiment, expanded by default)
+SENTIMENT_SECTIONS = (
+    ("Positive", "positive", True),
+    ("Neutral", "neutral", False),
+    ("Negative", "negative", False),
+)
+
+# Placeholder correlations between the selected symbol and its comparison assets
+PEER_ASSETS = ["MSFT", "GOOGL", "AMZN", "META", "SPY"]
+PEER_CORRELATION = np.array([
+    [1.00, 0.60, 0.77, 0.61, 0.48, 0.53],
+    [0.60, 1.00, 0.54, 0.60, 0.54, 0.64],
+    [0.77, 0.54, 1.00, 0.54, 0.45, 0.48],
+    [0.61, 0.60, 0.54, 1.00, 0.54, 0.69],
+    [0.48, 0.54, 0.45, 0.54, 1.00, 0.60],
+    [0.53, 0.64, 0.48, 0.69, 0.60, 1.00],
+], dtype=np.float32)
+
+OSCILLATOR_TITLES = {
+    "rsi": 'RSI (Relative Strength Index)',
+    "macd": 'MACD (Moving Average Convergence Divergence)'
+}
+
+def _warm_indicator_kernels():
+    """Run each Numba kernel once on dummy data so later calls skip compilation"""
+    close = np.linspace(100.0, 110.0, 64)
+    compute_price_indicators(close)
+    lttb_indices(np.arange(64), close, 16)
+    bollinger_band_arrays(close)
+    ichimoku_arrays(close + 1.0, close - 1.0)
+
+# Compile or load the kernels in the background so it overlaps the first data fetch
+if NUMBA_AVAILABLE:
+    threading.Thread(target=_warm_indicator_kernels, name="indicator-warmup", daemon=True).start()
+
+@st.cache_resource
+def _news_agent():
+    """Shared news sentiment agent reused across reruns"""
+    return without_history(NewsSentimentAgent())
+
+@st.cache_resource
+def _tech_agent():
+    """Shared technical analysis agent reused across reruns"""
+    # Fetch through the shared market data agent so both use one price cache
+    return without_history(TechnicalAnalysisAgent(market_data_agent=get_market_data_agent()))
+
+def _subplot_axes(row):
+    """Axis references for a trace placed in the given row of a one-column grid"""
+    suffix = str(row) if row > 1 else ""
+    return {"xaxis": f"x{suffix}", "yaxis": f"y{suffix}"}
+
+@st.cache_data(show_spinner=False)
+def _subplot_grid(rows, subplot_titles, vertical_spacing, row_heights=None):
+    """Axis domains and title annotations for a one-column shared-x subplot grid"""
+    layout = make_subplots(
+        rows=rows, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=vertical_spacing,
+        row_heights=list(row_heights) if row_heights else None,
+        subplot_titles=subplot_titles
+    ).layout.to_plotly_json()
+    
+    # The default template is applied by go.Figure anyway; keep only the grid
+    layout.pop("template", None)
+    return layout
+
+def _grid_layout(grid, layout):
+    """Layout merged over a subplot grid, keeping each axis's domain and anchor"""
+    merged = {**grid, **layout}
+    for key in grid.keys() & layout.keys():
+        if key.startswith(("xaxis", "yaxis")):
+            merged[key] = {**grid[key], **layout[key]}
+    return merged
+
+def _hline(y, row, dash, color, text):
+    """Horizontal reference line and its label for a subplot row, as add_hline draws them"""
+    suffix = str(row) if row > 1 else ""
+    shape = dict(
+        type='line', xref=f"x{suffix} domain", x0=0, x1=1, yref=f"y{suffix}", y0=y, y1=y,
+        line=dict(color=color, dash=dash)
+    )
+    annotation = dict(
+        text=text, showarrow=False, xref=f"x{suffix} domain", x=1, xanchor='right',
+        yref=f"y{suffix}", y=y, yanchor='bottom'
+    )
+    return shape, annotation
+
+def _line_xy(x, series, max_points=LTTB_MAX_POINTS):
+    """Float32 x/y arrays for a line trace, LTTB-downsampled when too long"""
+    y = np.asarray(series, dtype=np.float32)
+    if len(y) > max_points:
+        idx = lttb_indices(x, y, max_points)
+        return {"x": x[idx], "y": y[idx]}
+    return {"x": x, "y": y}
+
+def _centered_moving_average(x, window):
+    """Centred moving average matching np.convolve with mode="same", in O(N)"""
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    idx = np.arange(len(x))
+    lo = np.maximum(idx - window // 2, 0)
+    hi = np.minimum(idx + (window - 1) // 2 + 1, len(x))
+    return (cs[hi] - cs[lo]) / window
+
+def _price_trace(price_xy, color):
+    """Price line trace over x/y arrays prepared once per render"""
+    return go.Scattergl(**price_xy, name="Price", line=dict(color=color))
+
+# Static part of the enhanced chart layout shared by every figure
+_BASE_LAYOUT = {
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'font': {'color': CHART_COLORS['text'], 'family': 'Inter, -apple-system, sans-serif'},
+    'xaxis': {
+        'gridcolor': CHART_COLORS['grid'],
+        'showgrid': True,
+        'color': CHART_COLORS['text'],
+        'type': 'date',
+        'tickformat': '%Y-%m-%d',
+        'showline': True,
+        'linecolor': CHART_COLORS['grid'],
+        'mirror': True
+    },
+    'yaxis': {
+        'gridcolor': CHART_COLORS['grid'],
+        'showgrid': True,
+        'color': CHART_COLORS['text'],
+        'showline': True,
+        'linecolor': CHART_COLORS['grid'],
+        'mirror': True
+    },
+    'margin': {'t': 50, 'r': 30, 'b': 50, 'l': 60},
+    'legend': {
+        'orientation': 'h',
+        'yanchor': 'bottom',
+        'y': -0.2,
+        'xanchor': 'center',
+        'x': 0.5,
+        'bgcolor': 'rgba(0,0,0,0.3)',
+        'bordercolor': CHART_COLORS['grid'],
+        'borderwidth': 1,
+        'font': {'size': 12}
+    },
+    'hovermode': 'x unified',
+    'hoverlabel': {
+        'bgcolor': 'rgba(0,0,0,0.8)',
+        'bordercolor': CHART_COLORS['primary'],
+        'font': {'color': 'white', 'size': 12}
+    }
+}
+
 def get_enhanced_layout(title, height=400):
     """Get enhanced layout configuration for charts"""
+    # Axis dicts are copied because callers set titles and ranges on them
     return {
+        **_BASE_LAYOUT,
         'title': {
             'text': title,
             'font': {'size': 18, 'color': CHART_COLORS['text'], 'family': 'Inter, -apple-system, sans-serif'},
             'x': 0.02,
             'y': 0.98
         },
-        'paper_bgcolor': 'rgba(0,0,0,0)',
-        'plot_bgcolor': 'rgba(0,0,0,0)',
-        'font': {'color': CHART_COLORS['text'], 'family': 'Inter, -apple-system, sans-serif'},
-        'xaxis': {
-            'gridcolor': CHART_COLORS['grid'],
-            'showgrid': True,
-            'color': CHART_COLORS['text'],
-            'tickformat': '%Y-%m-%d',
-            'showline': True,
-            'linecolor': CHART_COLORS['grid'],
-            'mirror': True
-        },
-        'yaxis': {
-            'gridcolor': CHART_COLORS['grid'],
-            'showgrid': True,
-            'color': CHART_COLORS['text'],
-            'showline': True,
-            'linecolor': CHART_COLORS['grid'],
-            'mirror': True
-        },
-        'margin': {'t': 50, 'r': 30, 'b': 50, 'l': 60},
-        'height': height,
-        'legend': {
-            'orientation': 'h',
-            'yanchor': 'bottom',
-            'y': -0.2,
-            'xanchor': 'center',
-            'x': 0.5,
-            'bgcolor': 'rgba(0,0,0,0.3)',
-            'bordercolor': CHART_COLORS['grid'],
-            'borderwidth': 1,
-            'font': {'size': 12}
-        },
-        'hovermode': 'x unified',
-        'hoverlabel': {
-            'bgcolor': 'rgba(0,0,0,0.8)',
-            'bordercolor': CHART_COLORS['primary'],
-            'font': {'color': 'white', 'size': 12}
-        }
+        'xaxis': {**_BASE_LAYOUT['xaxis']},
+        'yaxis': {**_BASE_LAYOUT['yaxis']},
+        'height': height
     }
 
+def _apply_quick_select():
+    """Copy the quick-select choice into the symbol input and reset the picker"""
+    if st.session_state.quick_select:
+        st.session_state.symbol_input = st.session_state.quick_select
+        st.session_state.quick_select = None
+
 def render_analysis():
     st.title("📊 Financial Analysis Dashboard")
+    now = datetime.now()
     
     # Enhanced sidebar with stock overview
     with st.sidebar:
         st.markdown("### 🎯 Stock Selection")
         
         # Symbol input with enhanced styling
+        if "symbol_input" not in st.session_state:
+            st.session_state.symbol_input = "AAPL"
         symbol = st.text_input(
             "Enter Stock Symbol", 
-            value="AAPL",
+            key="symbol_input",
             placeholder="e.g., AAPL, GOOGL, MSFT",
             help="Enter a valid stock ticker symbol"
         )
         
-        # Quick symbol buttons for popular stocks
-        st.markdown("**Quick Select:**")
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            if st.button("AAPL", key="aapl_btn"):
-                symbol = "AAPL"
-        with col2:
-            if st.button("GOOGL", key="googl_btn"):
-                symbol = "GOOGL"
-        with col3:
-            if st.button("MSFT", key="msft_btn"):
-                symbol = "MSFT"
-        
-        col4, col5, col6 = st.columns(3)
-        with col4:
-            if st.button("TSLA", key="tsla_btn"):
-                symbol = "TSLA"
-        with col5:
-            if st.button("AMZN", key="amzn_btn"):
-                symbol = "AMZN"
-        with col6:
-            if st.button("META", key="meta_btn"):
-                symbol = "META"
+        # Quick symbol picker for popular stocks
+        st.segmented_control(
+            "Quick Select:",
+            POPULAR_SYMBOLS,
+            key="quick_select",
+            on_change=_apply_quick_select
+        )
         
         st.divider()
         
@@ -138,7 +376,7 @@ def render_analysis():
         st.markdown("### 📅 Time Range")
         time_range = st.selectbox(
             "Select Period",
-            ["1 Month", "3 Months", "6 Months", "1 Year", "2 Years", "5 Years", "Custom"],
+            [*RANGE_DAYS, "Custom"],
             index=2,  # Default to 6 months
             help="Choose the time period for analysis"
         )
@@ -146,25 +384,14 @@ def render_analysis():
         # Custom date range if selected
         if time_range == "Custom":
             col1, col2 = st.columns(2)
-    with col1:
-        start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=180))
-    with col2:
-        end_date = st.date_input("End Date", value=datetime.now())
+            with col1:
+                start_date = st.date_input("Start Date", value=now - timedelta(days=180))
+            with col2:
+                end_date = st.date_input("End Date", value=now)
         else:
             # Calculate dates based on selection
-            end_date = datetime.now()
-            if time_range == "1 Month":
-                start_date = end_date - timedelta(days=30)
-            elif time_range == "3 Months":
-                start_date = end_date - timedelta(days=90)
-            elif time_range == "6 Months":
-                start_date = end_date - timedelta(days=180)
-            elif time_range == "1 Year":
-                start_date = end_date - timedelta(days=365)
-            elif time_range == "2 Years":
-                start_date = end_date - timedelta(days=730)
-            elif time_range == "5 Years":
-                start_date = end_date - timedelta(days=1825)
+            end_date = now
+            start_date = end_date - timedelta(days=RANGE_DAYS[time_range])
         
         st.divider()
         
@@ -196,6 +423,14 @@ def render_analysis():
                 show_volume = st.checkbox("Volume", value=True)
                 show_vwap = st.checkbox("VWAP", value=False)
                 show_obv = st.checkbox("OBV", value=False)
+            
+            # Only the indicators toggled on here are computed and plotted
+            selected_indicators = tuple(
+                name for name, enabled in (
+                    ("sma20", show_ma20), ("sma50", show_ma50), ("sma200", show_ma200),
+                    ("ema", show_ema), ("rsi", show_rsi), ("macd", show_macd), ("bollinger", show_bb)
+                ) if enabled
+            )
         
         st.divider()
         
@@ -207,6 +442,16 @@ def render_analysis():
             help="Click to start the analysis with selected parameters"
         )
         
+        # Keep results on screen through reruns from in-page widgets such as the
+        # view selector; changing any input above still needs another click
+        run_key = (
+            symbol, analysis_type, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"),
+            selected_indicators if analysis_type == "Technical Analysis" else ()
+        )
+        if run_analysis:
+            st.session_state.analysis_run_key = run_key
+        run_analysis = st.session_state.get("analysis_run_key") == run_key
+        
         # Stock overview section (if symbol is provided)
         if symbol and len(symbol) > 0:
             st.divider()
@@ -214,21 +459,23 @@ def render_analysis():
             
             # Try to fetch basic stock info for sidebar display
             try:
-                market_data_agent = MarketDataAgent()
                 with st.spinner("Loading stock info..."):
-                    basic_info = asyncio.run(market_data_agent.fetch_market_data(
-                        symbol, 
-                        start_date=(datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
-                        end_date=datetime.now().strftime("%Y-%m-%d"),
-                        interval="1d"
-                    ))
+                    # Reuse the frame the analysis tabs fetched only while it is current;
+                    # a past custom range or an expired fetch would show a stale price
+                    history = st.session_state.get(f"df_{symbol}")
+                    if history is None or not _is_current_frame(history, now):
+                        history = _fetch_price_history(
+                            symbol, 
+                            (now - timedelta(days=2)).strftime("%Y-%m-%d"),
+                            now.strftime("%Y-%m-%d")
+                        )
                     
-                    if basic_info and "historical_data" in basic_info and len(basic_info["historical_data"]) > 0:
-                        latest_data = basic_info["historical_data"][-1]
-                        prev_data = basic_info["historical_data"][-2] if len(basic_info["historical_data"]) > 1 else latest_data
+                    if not history.empty:
+                        latest_data = history.iloc[-1]
+                        prev_data = history.iloc[-2] if len(history) > 1 else latest_data
                         
-                        current_price = latest_data.get("Close", 0)
-                        prev_price = prev_data.get("Close", current_price)
+                        current_price = latest_data["Close"]
+                        prev_price = prev_data["Close"]
                         change = current_price - prev_price
                         change_pct = (change / prev_price * 100) if prev_price != 0 else 0
                         
@@ -245,17 +492,15 @@ def render_analysis():
                             )
                         
                         # Additional metrics
-                        if len(basic_info["historical_data"]) > 1:
-                            prices = [d["Close"] for d in basic_info["historical_data"]]
-                            high_52w = max(prices)
-                            low_52w = min(prices)
-                            volume = latest_data.get("Volume", 0)
+                        if len(history) > 1:
+                            low_52w, high_52w = history["Close"].agg(["min", "max"])
+                            volume = int(latest_data["Volume"])
                             
                             st.markdown("**Range Information:**")
                             col1, col2 = st.columns(2)
                             with col1:
-                                st.markdown(f"**Day High:** ${latest_data.get('High', 0):.2f}")
-                                st.markdown(f"**Day Low:** ${latest_data.get('Low', 0):.2f}")
+                                st.markdown(f"**Day High:** ${latest_data['High']:.2f}")
+                                st.markdown(f"**Day Low:** ${latest_data['Low']:.2f}")
                             with col2:
                                 st.markdown(f"**52W High:** ${high_52w:.2f}")
                                 st.markdown(f"**52W Low:** ${low_52w:.2f}")
@@ -285,8 +530,8 @@ def render_analysis():
                             st.markdown(f"{trend_emoji} **Trend:** {trend_text}")
                             
                             # Volume analysis
-                            if len(basic_info["historical_data"]) > 5:
-                                avg_volume = sum(d.get("Volume", 0) for d in basic_info["historical_data"][-5:]) / 5
+                            if len(history) > 5:
+                                avg_volume = history["Volume"].to_numpy()[-5:].mean()
                                 volume_ratio = volume / avg_volume if avg_volume > 0 else 1
                                 
                                 if volume_ratio > 1.5:
@@ -315,7 +560,7 @@ def render_analysis():
     
     # Main content
     if analysis_type == "Technical Analysis":
-        render_technical_analysis(symbol, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), run_analysis)
+        render_technical_analysis(symbol, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), run_analysis, selected_indicators)
     elif analysis_type == "Fundamental Analysis":
         render_fundamental_analysis(symbol, run_analysis)
     elif analysis_type == "Sentiment Analysis":
@@ -323,454 +568,806 @@ def render_analysis():
     elif analysis_type == "Risk Analysis":
         render_risk_analysis(symbol, run_analysis)
 
-def render_technical_analysis(symbol, start_date, end_date, run_analysis):
+def _history_frame(records):
+    """DataFrame of the date and OHLCV fields from the market agent's history records"""
+    if not records:
+        return pd.DataFrame()
+    # Intraday records are keyed by Datetime rather than Date
+    date_key = "Date" if "Date" in records[0] else "Datetime"
+    return pd.DataFrame.from_records(records, columns=(date_key,) + HISTORY_PRICE_COLUMNS)
+
+def _parse_dates(df):
+    """Frame with a datetime Date column, parsing only values that are not datetimes yet"""
+    # Intraday history arrives with a Datetime column instead of Date
+    if "Datetime" in df.columns and "Date" not in df.columns:
+        df = df.rename(columns={"Datetime": "Date"})
+    if "Date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], format="ISO8601", cache=True)
+    return df
+
+@st.cache_data(ttl=PRICE_CACHE_TTL, show_spinner=False)
+def _fetch_price_history(symbol, start_date, end_date):
+    """Fetch daily price history as a date-sorted DataFrame"""
+    # Cached bodies only run on a miss, so these logs give the miss rate
+    logger.debug("Price history cache miss for %s (%s to %s)", symbol, start_date, end_date)
+    market_data = run_async(get_market_data_agent().fetch_market_data(
+        symbol, 
+        start_date=start_date,
+        end_date=end_date,
+        interval="1d"
+    ))
+    
+    return _price_frame(market_data)
+
+def _price_frame(market_data):
+    """Date-sorted float32 price DataFrame from a market data agent response"""
+    # Raise instead of returning so fetch errors are never cached
+    if "error" in market_data:
+        raise ValueError(market_data["error"])
+    
+    df = _history_frame(market_data.get("historical_data", []))
+    if df.empty:
+        return df
+    
+    # Handle Date column from yfinance
+    df = _parse_dates(df)
+    
+    # Sort by date
+    df = df.sort_values("Date")
+    
+    # Volume is a whole-share count; store it in the smallest unsigned type that holds it
+    if "Volume" in df.columns:
+        df["Volume"] = pd.to_numeric(df["Volume"], downcast="unsigned")
+    
+    # Plotly draws in float32 anyway; halve the cached and serialized size
+    df = _as_float32(df)
+    
+    # Fetch time travels with the cached frame so readers can tell how fresh it is
+    df.attrs["fetched_at"] = datetime.now()
+    return df
+
+def _is_current_frame(df, now):
+    """Whether a price frame ends today and was fetched within the price cache TTL"""
+    fetched_at = df.attrs.get("fetched_at")
+    return (
+        not df.empty
+        and fetched_at is not None
+        and (now - fetched_at).total_seconds() < PRICE_CACHE_TTL
+        and df["Date"].iat[-1].date() == now.date()
+    )
+
+async def _gather_history_and_summary(symbol, start_date, end_date):
+    """Fetch price history and run the summary analysis concurrently"""
+    return await asyncio.gather(
+        get_market_data_agent().fetch_market_data(
+            symbol, 
+            start_date=start_date,
+            end_date=end_date,
+            interval="1d"
+        ),
+        _tech_agent().run({
+            "symbol": symbol,
+            "indicators": list(SUMMARY_INDICATORS),
+            "period": SUMMARY_PERIOD
+        })
+    )
+
+@st.cache_data(ttl=PRICE_CACHE_TTL, show_spinner=False)
+def _fetch_history_and_summary(symbol, start_date, end_date):
+    """Price history plus the summary analysis data, or None if the analysis failed"""
+    logger.debug("Price history and summary cache miss for %s (%s to %s)", symbol, start_date, end_date)
+    market_data, summary = run_async(_gather_history_and_summary(symbol, start_date, end_date))
+    
+    # A failed summary is not cached; the caller falls back to a separate run
+    return _price_frame(market_data), summary["data"] if summary["status"] == "success" else None
+
+def _technical_history(symbol, start_date, end_date):
+    """Price history from the same cache entry the technical analysis page fetched"""
+    return _fetch_history_and_summary(symbol, start_date, end_date)[0]
+
+def _date_ms(df):
+    """Epoch-millisecond dates so Plotly ships the x-axis as one int64 typed array"""
+    dates = df["Date"]
+    if dates.dt.tz is not None:
+        # yfinance dates are exchange-local midnights; keep the wall-clock date
+        # instead of shifting every bar to its UTC hour
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _compute_indicators(symbol, start_date, end_date, indicators):
+    """Price history with the selected indicators added"""
+    df = _technical_history(symbol, start_date, end_date)
+    if df.empty:
+        return df
+    
+    # Calculate moving averages, RSI, MACD and Bollinger Bands in one pass
+    df = df.assign(**compute_price_indicators(df["Close"].to_numpy(dtype=np.float64), indicators))
+    return _as_float32(df)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _run_tech_analysis(symbol, period, indicators):
+    """Run the technical analysis agent and return its analysis data"""
+    logger.debug("Technical analysis cache miss for %s (period %s)", symbol, period)
+    result = run_async(_tech_agent().run({
+        "symbol": symbol,
+        "indicators": list(indicators),
+        "period": period
+    }))
+    
+    # Raise instead of returning so failed runs are never cached
+    if result["status"] != "success":
+        raise ValueError(result.get("message", "Unknown error"))
+    return result["data"]
+
+def _tech_analysis_result(symbol, period, indicators):
+    """Cached technical analysis wrapped in the agent's status envelope"""
+    try:
+        return {"status": "success", "data": _run_tech_analysis(symbol, period, indicators)}
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_fundamentals(symbol):
+    """Latest quote and fundamental fields for a symbol"""
+    logger.debug("Fundamentals cache miss for %s", symbol)
+    market_data = run_async(get_market_data_agent().fetch_market_data(symbol, interval="1d"))
+    
+    # Raise instead of returning so fetch errors are never cached
+    if "error" in market_data:
+        raise ValueError(market_data["error"])
+    return market_data
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_sentiment(symbol):
+    """News sentiment for a symbol over the past week"""
+    logger.debug("Sentiment cache miss for %s", symbol)
+    sentiment_data = run_async(_news_agent().process(f"What is the sentiment for {symbol} this week?"))
+    
+    # Raise instead of returning so failed lookups are never cached
+    if sentiment_data.get("status") == "error":
+        raise ValueError(sentiment_data.get("message", "Unknown error"))
+    return sentiment_data
+
+@dataclass
+class PivotLevels:
+    """Classic pivot point with two support and resistance levels"""
+    close: float
+    pivot: float
+    r1: float
+    r2: float
+    s1: float
+    s2: float
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _pivot_levels(symbol, start_date, end_date):
+    """Pivot levels from the last 30 sessions of the cached price history"""
+    df = _technical_history(symbol, start_date, end_date)
+    # Reduce over array views of the last 30 rows instead of a tail() frame copy
+    high = float(np.nanmax(df["High"].to_numpy()[-30:]))
+    low = float(np.nanmin(df["Low"].to_numpy()[-30:]))
+    close = float(df["Close"].iat[-1])
+    
+    # Pivot point calculation
+    pivot = (high + low + close) / 3
+    return PivotLevels(
+        close=close,
+        pivot=pivot,
+        r1=2 * pivot - low,
+        r2=pivot + (high - low),
+        s1=2 * pivot - high,
+        s2=pivot - (high - low)
+    )
+
+def _signal_table_html(indicator_data):
+    """HTML table of (indicator, signal) rows with each signal cell colored"""
+    rows = "".join(
+        f"<tr><td>{name}</td><td style='background-color: {SIGNAL_BACKGROUNDS.get(signal, 'lightgray')}'>{signal}</td></tr>"
+        for name, signal in indicator_data
+    )
+    return f"<table><thead><tr><th>Indicator</th><th>Signal</th></tr></thead><tbody>{rows}</tbody></table>"
+
+def _render_metric_column(column, metrics):
+    """Render (label, value, delta) metrics stacked in one column"""
+    with column:
+        for label, value, delta in metrics:
+            st.metric(label, value, delta)
+
+def _recent_crossover(fast, slow, lookback=10):
+    """Most recent crossover of fast over slow within lookback bars as (direction, days ago)"""
+    window = min(lookback, len(fast))
+    spread = fast[-window:] - slow[-window:]
+    # One uint8 "fast leads" bit per bar; xor with the previous bar marks every
+    # transition, and pairs touching the NaN warm-up are masked out
+    above = (spread > 0).view(np.uint8)
+    valid = ~np.isnan(spread)
+    crosses = np.flatnonzero((above[1:] ^ above[:-1]) & valid[1:] & valid[:-1])
+    if crosses.size == 0:
+        return None
+    last = crosses[-1]
+    return ("Bullish" if above[last + 1] else "Bearish"), window - 1 - last
+
+def _as_float32(df):
+    """Downcast every float64 column of df to float32"""
+    return df.astype({c: np.float32 for c in df.columns if df[c].dtype == np.float64})
+
+def _oscillator_signals(close_arr, rsi_arr, macd_arr, sig_arr, hist_arr):
+    """Render the oscillator signal metrics"""
+    show_rsi = rsi_arr is not None
+    show_macd = macd_arr is not None
+    
+    st.subheader("📊 Oscillator Signals")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    if show_rsi:
+        current_rsi = rsi_arr[-1] if not np.isnan(rsi_arr[-1]) else 50
+        
+        with col1:
+            if current_rsi > 70:
+                rsi_signal = "🔴 Overbought"
+            elif current_rsi < 30:
+                rsi_signal = "🟢 Oversold"
+            else:
+                rsi_signal = "🟡 Neutral"
+            st.metric("RSI Signal", rsi_signal, f"{current_rsi:.1f}")
+    
+    if show_macd:
+        current_macd = macd_arr[-1] if not np.isnan(macd_arr[-1]) else 0
+        current_signal = sig_arr[-1] if not np.isnan(sig_arr[-1]) else 0
+        current_histogram = hist_arr[-1] if not np.isnan(hist_arr[-1]) else 0
+        
+        with col2:
+            macd_signal = "🟢 Bullish" if current_macd > current_signal else "🔴 Bearish"
+            st.metric("MACD Signal", macd_signal, f"{current_macd:.4f}")
+        
+        with col3:
+            momentum = "🚀 Increasing" if current_histogram > 0 else "📉 Decreasing"
+            st.metric("Momentum", momentum, f"{current_histogram:.4f}")
+    
+    with col4:
+        # Divergence detection (simplified)
+        price_trend = "📈 Up" if close_arr[-1] > close_arr[-10] else "📉 Down"
+        st.metric("Price Trend", price_trend)
+
+def _oscillator_analysis(rsi_arr, macd_arr, sig_arr):
+    """Render the written RSI/MACD analysis"""
+    show_rsi = rsi_arr is not None
+    show_macd = macd_arr is not None
+    
+    st.subheader("Oscillator Analysis")
+    
+    if show_rsi:
+        # Get latest RSI value
+        last_rsi = rsi_arr[-1]
+        
+        # RSI analysis
+        if last_rsi > 70:
+            rsi_status = "Overbought"
+        elif last_rsi < 30:
+            rsi_status = "Oversold"
+        else:
+            rsi_status = "Neutral"
+        
+        st.write(f"**RSI (14):** {last_rsi:.2f} - {rsi_status}")
+    
+    if show_macd:
+        # Get latest MACD values
+        last_macd = macd_arr[-1]
+        last_signal = sig_arr[-1]
+        
+        # MACD analysis
+        if last_macd > last_signal:
+            macd_status = "Bullish"
+        else:
+            macd_status = "Bearish"
+        
+        # Check for recent MACD crossover
+        crossover = _recent_crossover(macd_arr, sig_arr)
+        if crossover:
+            direction, days_ago = crossover
+            macd_crossover = f"{direction} crossover detected {days_ago} days ago"
+        else:
+            macd_crossover = "No recent crossover"
+        
+        st.write(f"**MACD:** {macd_status} ({macd_crossover})")
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _price_volume_figure(symbol, start_date, end_date):
+    """Candlestick and volume figure spec for the price tab"""
+    df = _technical_history(symbol, start_date, end_date)
+    date_arr = _date_ms(df)
+    
+    # Subplot grid is built once per shape; the figure is assembled from dicts in one shot
+    grid = _subplot_grid(2, ('Price Action', 'Volume'), 0.05, (0.7, 0.3))
+    
+    # Pull the OHLCV columns out once as NumPy arrays so Plotly can
+    # ship them as typed arrays instead of per-element JSON
+    open_arr = df["Open"].values
+    close_arr = df["Close"].values
+    
+    # Add volume bars with color coding
+    colors = np.where(close_arr >= open_arr, VOLUME_UP_COLOR, VOLUME_DOWN_COLOR)
+    
+    data = [
+        # Candlestick chart
+        dict(
+            type='candlestick',
+            x=date_arr,
+            open=open_arr,
+            high=df["High"].values,
+            low=df["Low"].values,
+            close=close_arr,
+            **_subplot_axes(1),
+            name="Price",
+            increasing=dict(line=dict(color=CHART_COLORS['success']), fillcolor=CHART_COLORS['success']),
+            decreasing=dict(line=dict(color=CHART_COLORS['danger']), fillcolor=CHART_COLORS['danger'])
+        ),
+        dict(
+            type='bar',
+            x=date_arr, 
+            y=df["Volume"].values, 
+            **_subplot_axes(2),
+            name="Volume",
+            marker=dict(color=colors),
+            showlegend=False
+        )
+    ]
+    
+    # Enhanced layout
+    layout = get_enhanced_layout(f"{symbol} Price and Volume Analysis", 600)
+    layout['yaxis']['title'] = 'Price ($)'
+    layout['yaxis2'] = {
+        'title': 'Volume',
+        'gridcolor': CHART_COLORS['grid'],
+        'showgrid': True,
+        'color': CHART_COLORS['text']
+    }
+    layout['xaxis2'] = {'type': 'date', 'showgrid': True, 'gridcolor': CHART_COLORS['grid']}
+    
+    fig = go.Figure(dict(data=data, layout=_grid_layout(grid, layout)))
+    return fig.to_dict()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _moving_average_figure(symbol, start_date, end_date, indicators):
+    """Moving average and Bollinger Band figure spec for the moving averages tab"""
+    df = _compute_indicators(symbol, start_date, end_date, indicators)
+    date_arr = _date_ms(df)
+    
+    # Build all trace dicts up front and create the figure in one shot
+    data = []
+    
+    # Add Bollinger Bands first (background)
+    if "BB_Upper" in df.columns:
+        data.append(dict(
+            type='scattergl',
+            **_line_xy(date_arr, df["BB_Upper"]),
+            line=dict(color='rgba(58, 123, 213, 0.3)', width=1),
+            name='BB Upper',
+            showlegend=False
+        ))
+        
+        data.append(dict(
+            type='scattergl',
+            **_line_xy(date_arr, df["BB_Lower"]),
+            fill='tonexty',
+            fillcolor='rgba(58, 123, 213, 0.1)',
+            line=dict(color='rgba(58, 123, 213, 0.3)', width=1),
+            name='Bollinger Bands',
+            showlegend=True
+        ))
+    
+    # Add price line
+    data.append(dict(
+        type='scattergl',
+        **_line_xy(date_arr, df["Close"]), 
+        name="Price",
+        line=dict(color=CHART_COLORS['primary'], width=2)
+    ))
+    
+    # Add the selected moving averages with enhanced styling
+    for column, name, color, dash in MOVING_AVERAGE_TRACES:
+        if column in df.columns:
+            data.append(dict(
+                type='scattergl',
+                **_line_xy(date_arr, df[column]), 
+                name=name,
+                line=dict(color=color, width=2, dash=dash)
+            ))
+    
+    # Enhanced layout
+    layout = get_enhanced_layout(f"{symbol} Moving Averages & Bollinger Bands", 500)
+    layout['yaxis']['title'] = 'Price ($)'
+    fig = go.Figure(dict(data=data, layout=layout))
+    return fig.to_dict()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _oscillator_figure(symbol, start_date, end_date, indicators):
+    """RSI and MACD subplot figure spec for the oscillators tab"""
+    df = _compute_indicators(symbol, start_date, end_date, indicators)
+    date_arr = _date_ms(df)
+    show_rsi = "RSI" in df.columns
+    show_macd = "MACD" in df.columns
+    
+    # One subplot row per selected oscillator
+    panels = [panel for panel, shown in (("rsi", show_rsi), ("macd", show_macd)) if shown]
+    rsi_row = panels.index("rsi") + 1 if show_rsi else None
+    macd_row = panels.index("macd") + 1 if show_macd else None
+    
+    # Subplot grid for the selected oscillators, built once per panel combination
+    grid = _subplot_grid(len(panels), tuple(OSCILLATOR_TITLES[panel] for panel in panels), 0.08)
+    
+    # Enhanced layout for oscillators
+    layout = get_enhanced_layout(f"{symbol} Technical Oscillators", 350 * len(panels))
+    
+    # Collect trace dicts and reference lines, then build the figure in a single call
+    data = []
+    hlines = []
+    
+    if show_rsi:
+        # Enhanced RSI with gradient fill
+        data.append(dict(
+            type='scattergl',
+            **_line_xy(date_arr, df["RSI"]), 
+            **_subplot_axes(rsi_row),
+            name="RSI",
+            line=dict(color=CHART_COLORS['purple'], width=2),
+            fill='tonexty',
+            fillcolor='rgba(139, 92, 246, 0.1)'
+        ))
+    
+    if show_macd:
+        # Enhanced MACD with histogram colors
+        histogram_arr = df["Histogram"].to_numpy(dtype=np.float32)
+        histogram_colors = np.where(histogram_arr >= 0, CHART_COLORS['success'], CHART_COLORS['danger'])
+        
+        data.append(dict(
+            type='bar',
+            x=date_arr, 
+            y=histogram_arr, 
+            **_subplot_axes(macd_row),
+            name="MACD Histogram",
+            marker=dict(color=histogram_colors),
+            opacity=0.7
+        ))
+        
+        data.append(dict(
+            type='scattergl',
+            **_line_xy(date_arr, df["MACD"]), 
+            **_subplot_axes(macd_row),
+            name="MACD Line",
+            line=dict(color=CHART_COLORS['primary'], width=2)
+        ))
+        
+        data.append(dict(
+            type='scattergl',
+            **_line_xy(date_arr, df["Signal"]), 
+            **_subplot_axes(macd_row),
+            name="Signal Line",
+            line=dict(color=CHART_COLORS['warning'], width=2, dash='dash')
+        ))
+    
+    if show_rsi:
+        # Add RSI reference lines with enhanced styling
+        hlines.append(_hline(70, rsi_row, "dash", CHART_COLORS['danger'], "Overbought (70)"))
+        hlines.append(_hline(50, rsi_row, "dot", CHART_COLORS['text'], "Neutral (50)"))
+        hlines.append(_hline(30, rsi_row, "dash", CHART_COLORS['success'], "Oversold (30)"))
+    
+    if show_macd:
+        # Add zero line for MACD
+        hlines.append(_hline(0, macd_row, "dot", CHART_COLORS['text'], "Zero Line"))
+    
+    for panel, row in (("rsi", rsi_row), ("macd", macd_row)):
+        if row is None:
+            continue
+        axis_key = "yaxis" if row == 1 else f"yaxis{row}"
+        axis = layout[axis_key] if axis_key in layout else {
+            'gridcolor': CHART_COLORS['grid'],
+            'showgrid': True,
+            'color': CHART_COLORS['text']
+        }
+        axis['title'] = 'RSI' if panel == "rsi" else 'MACD'
+        if panel == "rsi":
+            axis['range'] = [0, 100]
+        layout[axis_key] = axis
+    
+    # Every x-axis in the grid is date-typed
+    for row in range(2, len(panels) + 1):
+        layout[f"xaxis{row}"] = {'type': 'date'}
+    
+    layout = _grid_layout(grid, layout)
+    layout['shapes'] = [shape for shape, _ in hlines]
+    layout['annotations'] = grid['annotations'] + [annotation for _, annotation in hlines]
+    fig = go.Figure(dict(data=data, layout=layout))
+    return fig.to_dict()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _bollinger_figure(symbol, start_date, end_date):
+    """Price and Bollinger Band figure spec for the advanced indicators tab"""
+    df = _technical_history(symbol, start_date, end_date)
+    date_arr = _date_ms(df)
+    price_xy = _line_xy(date_arr, df["Close"])
+    
+    # Create a figure with Bollinger Bands
+    fig = go.Figure()
+    
+    # Add price line
+    fig.add_trace(_price_trace(price_xy, 'blue'))
+    
+    # Add Bollinger Bands for the entire period straight from the close array
+    bb_mid, bb_high, bb_low = bollinger_band_arrays(df["Close"].to_numpy())
+    
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, bb_high), 
+        name="Upper Band",
+        line=dict(color='red', dash='dash')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, bb_mid), 
+        name="Middle Band",
+        line=dict(color='green', dash='dash')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, bb_low), 
+        name="Lower Band",
+        line=dict(color='red', dash='dash')
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        title=f"{symbol} Bollinger Bands",
+        xaxis_title="Date",
+        xaxis_type="date",
+        yaxis_title="Price ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        uirevision=symbol
+    )
+    return fig.to_dict()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _ichimoku_figure(symbol, start_date, end_date):
+    """Price and Ichimoku Cloud figure spec for the advanced indicators tab"""
+    df = _technical_history(symbol, start_date, end_date)
+    date_arr = _date_ms(df)
+    price_xy = _line_xy(date_arr, df["Close"])
+    
+    # Create a figure with Ichimoku Cloud
+    fig = go.Figure()
+    
+    # Add price line
+    fig.add_trace(_price_trace(price_xy, 'black'))
+    
+    # Calculate Ichimoku components for the entire period
+    conversion_line, base_line, span_a, span_b = ichimoku_arrays(
+        df["High"].to_numpy(), df["Low"].to_numpy()
+    )
+    
+    # Add Ichimoku components
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, conversion_line), 
+        name="Conversion Line (Tenkan-sen)",
+        line=dict(color='blue')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, base_line), 
+        name="Base Line (Kijun-sen)",
+        line=dict(color='red')
+    ))
+    
+    # Add the cloud
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, span_a), 
+        name="Leading Span A (Senkou Span A)",
+        line=dict(color='green', width=0.5)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        **_line_xy(date_arr, span_b), 
+        name="Leading Span B (Senkou Span B)",
+        line=dict(color='red', width=0.5),
+        fill='tonexty', 
+        fillcolor='rgba(0, 250, 0, 0.1)'
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        title=f"{symbol} Ichimoku Cloud",
+        xaxis_title="Date",
+        xaxis_type="date",
+        yaxis_title="Price ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        uirevision=symbol
+    )
+    return fig.to_dict()
+
+def render_technical_analysis(symbol, start_date, end_date, run_analysis, indicators):
     st.header(f"Technical Analysis for {symbol}")
     
     if run_analysis:
-        # Initialize the market data agent
-        market_data_agent = MarketDataAgent()
-        
         # Use st.spinner to show loading state
         with st.spinner(f"Fetching market data for {symbol}..."):
-            # Run the agent to get market data
-            market_data = asyncio.run(market_data_agent.fetch_market_data(
-                symbol, 
-                start_date=start_date,
-                end_date=end_date,
-                interval="1d"
-            ))
-            
-            if "error" in market_data:
-                st.error(f"Error fetching data: {market_data['error']}")
+            # Fetch prices only; indicators are computed after the price chart is sent
+            # The summary analysis does not depend on the chart data, so it runs
+            # alongside the price fetch instead of after the tabs
+            try:
+                df, summary_data = _fetch_history_and_summary(symbol, start_date, end_date)
+            except ValueError as e:
+                st.error(f"Error fetching data: {e}")
                 return
             
-            # Convert historical data to DataFrame
-            if market_data and "historical_data" in market_data:
-                df = pd.DataFrame(market_data["historical_data"])
-                
-                # Handle Date column from yfinance
-                if "Date" in df.columns:
-                    df["Date"] = pd.to_datetime(df["Date"])
-                elif "Datetime" in df.columns:
-                    df["Date"] = pd.to_datetime(df["Datetime"])
-                    df = df.rename(columns={"Datetime": "Date"})
-                
-                # Sort by date
-                df = df.sort_values("Date")
-                
-                # Calculate moving averages
-                df["MA20"] = df["Close"].rolling(window=20).mean()
-                df["MA50"] = df["Close"].rolling(window=50).mean()
-                df["MA200"] = df["Close"].rolling(window=200).mean()
-                
-                # Calculate RSI
-                delta = df["Close"].diff()
-                gain = delta.where(delta > 0, 0)
-                loss = -delta.where(delta < 0, 0)
-                avg_gain = gain.rolling(window=14).mean()
-                avg_loss = loss.rolling(window=14).mean()
-                rs = avg_gain / avg_loss
-                df["RSI"] = 100 - (100 / (1 + rs))
-                
-                # Calculate MACD
-                df["EMA12"] = df["Close"].ewm(span=12, adjust=False).mean()
-                df["EMA26"] = df["Close"].ewm(span=26, adjust=False).mean()
-                df["MACD"] = df["EMA12"] - df["EMA26"]
-                df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
-                df["Histogram"] = df["MACD"] - df["Signal"]
-                
-                # Calculate Bollinger Bands
-                df["BB_Middle"] = df["Close"].rolling(window=20).mean()
-                bb_std = df["Close"].rolling(window=20).std()
-                df["BB_Upper"] = df["BB_Middle"] + (bb_std * 2)
-                df["BB_Lower"] = df["BB_Middle"] - (bb_std * 2)
+            # Let the sidebar overview read from this frame on later reruns
+            st.session_state[f"df_{symbol}"] = df
+            
+            if not df.empty:
+                # Epoch-millisecond x-axis shared by the charts built below; the
+                # date-typed axes render it as dates
+                date_arr = _date_ms(df)
                 
-                # Create tabs for different technical analysis views
-                tab1, tab2, tab3, tab4 = st.tabs(["📈 Price & Volume", "📊 Moving Averages", "⚡ Oscillators", "🤖 AI Analysis"])
+                # st.tabs would run every tab body on each rerun; a view selector only
+                # runs the selected one, so the indicator and agent work stays lazy
+                active_view = st.radio(
+                    "View",
+                    TECHNICAL_VIEWS,
+                    horizontal=True,
+                    key=f"tech_view_{symbol}",
+                    label_visibility="collapsed"
+                )
                 
-                with tab1:
+                if active_view == TECHNICAL_VIEWS[0]:
                     st.subheader("Price & Volume Analysis")
                     
-                    # Create enhanced candlestick chart with volume
-                    fig = make_subplots(
-                        rows=2, cols=1,
-                        shared_xaxes=True,
-                        vertical_spacing=0.05,
-                        row_heights=[0.7, 0.3],
-                        subplot_titles=('Price Action', 'Volume')
-                    )
-                    
-                    # Add candlestick chart
-                    fig.add_trace(
-                        go.Candlestick(
-                            x=df["Date"],
-                            open=df["Open"],
-                            high=df["High"],
-                            low=df["Low"],
-                            close=df["Close"],
-                            name="Price",
-                            increasing_line_color=CHART_COLORS['success'],
-                            decreasing_line_color=CHART_COLORS['danger'],
-                            increasing_fillcolor=CHART_COLORS['success'],
-                            decreasing_fillcolor=CHART_COLORS['danger']
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    # Add volume bars with color coding
-                    colors = ['rgba(16, 185, 129, 0.6)' if close >= open else 'rgba(239, 68, 68, 0.6)' 
-                             for close, open in zip(df["Close"], df["Open"])]
-                    
-                    fig.add_trace(
-                        go.Bar(
-                            x=df["Date"], 
-                            y=df["Volume"], 
-                            name="Volume",
-                            marker_color=colors,
-                            showlegend=False
-                        ),
-                        row=2, col=1
-                    )
-                    
-                    # Enhanced layout
-                    layout = get_enhanced_layout(f"{symbol} Price and Volume Analysis", 600)
-                    layout['yaxis']['title'] = 'Price ($)'
-                    layout['yaxis2'] = {
-                        'title': 'Volume',
-                        'gridcolor': CHART_COLORS['grid'],
-                        'showgrid': True,
-                        'color': CHART_COLORS['text']
-                    }
-                    
-                    fig.update_layout(layout)
-                    fig.update_xaxes(showgrid=True, gridcolor=CHART_COLORS['grid'])
+                    # Figure specs are cached per symbol and date range
+                    fig = _price_volume_figure(symbol, start_date, end_date)
                     
                     st.plotly_chart(fig, use_container_width=True)
                     
                     # Enhanced support and resistance levels
                     st.subheader("📍 Key Levels")
                     
-                    # Calculate pivot points and support/resistance levels
-                    recent_df = df.tail(30)
-                    high = recent_df["High"].max()
-                    low = recent_df["Low"].min()
-                    close = df["Close"].iloc[-1]
+                    # Pivot points and support/resistance levels, cached per symbol and range
+                    levels = _pivot_levels(symbol, start_date, end_date)
+                    close = levels.close
                     
-                    # Pivot point calculation
-                    pivot = (high + low + close) / 3
-                    r1 = 2 * pivot - low
-                    r2 = pivot + (high - low)
-                    s1 = 2 * pivot - high
-                    s2 = pivot - (high - low)
+                    def level_metric(label, value):
+                        return label, f"${value:.2f}", f"{((value-close)/close*100):+.1f}%"
                     
                     col1, col2, col3 = st.columns(3)
                     
-                    with col1:
-                        st.metric("🔴 Resistance 2", f"${r2:.2f}", f"{((r2-close)/close*100):+.1f}%")
-                        st.metric("🟡 Resistance 1", f"${r1:.2f}", f"{((r1-close)/close*100):+.1f}%")
-                    
-                    with col2:
-                        st.metric("⚪ Pivot Point", f"${pivot:.2f}", f"{((pivot-close)/close*100):+.1f}%")
-                        st.metric("💰 Current Price", f"${close:.2f}", "0.0%")
-                    
-                    with col3:
-                        st.metric("🟢 Support 1", f"${s1:.2f}", f"{((s1-close)/close*100):+.1f}%")
-                        st.metric("🔵 Support 2", f"${s2:.2f}", f"{((s2-close)/close*100):+.1f}%")
+                    _render_metric_column(col1, [
+                        level_metric("🔴 Resistance 2", levels.r2),
+                        level_metric("🟡 Resistance 1", levels.r1)
+                    ])
+                    _render_metric_column(col2, [
+                        level_metric("⚪ Pivot Point", levels.pivot),
+                        ("💰 Current Price", f"${close:.2f}", "0.0%")
+                    ])
+                    _render_metric_column(col3, [
+                        level_metric("🟢 Support 1", levels.s1),
+                        level_metric("🔵 Support 2", levels.s2)
+                    ])
                 
-                with tab2:
-                    st.subheader("Moving Averages Analysis")
-                    
-                    # Enhanced moving averages chart with Bollinger Bands
-                    fig = go.Figure()
-                    
-                    # Add Bollinger Bands first (background)
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["BB_Upper"],
-                        line=dict(color='rgba(58, 123, 213, 0.3)', width=1),
-                        name='BB Upper',
-                        showlegend=False
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["BB_Lower"],
-                        fill='tonexty',
-                        fillcolor='rgba(58, 123, 213, 0.1)',
-                        line=dict(color='rgba(58, 123, 213, 0.3)', width=1),
-                        name='Bollinger Bands',
-                        showlegend=True
-                    ))
-                    
-                    # Add price line
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["Close"], 
-                        name="Price",
-                        line=dict(color=CHART_COLORS['primary'], width=2)
-                    ))
+                elif active_view == TECHNICAL_VIEWS[1]:
+                    with st.spinner("Calculating indicators..."):
+                        df = _compute_indicators(symbol, start_date, end_date, indicators)
                     
-                    # Add moving averages with enhanced styling
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["MA20"], 
-                        name="MA 20",
-                        line=dict(color=CHART_COLORS['warning'], width=2, dash='solid')
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["MA50"], 
-                        name="MA 50",
-                        line=dict(color=CHART_COLORS['success'], width=2, dash='dash')
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=df["Date"], 
-                        y=df["MA200"], 
-                        name="MA 200",
-                        line=dict(color=CHART_COLORS['danger'], width=2, dash='dot')
-                    ))
+                    st.subheader("Moving Averages Analysis")
                     
-                    # Enhanced layout
-                    layout = get_enhanced_layout(f"{symbol} Moving Averages & Bollinger Bands", 500)
-                    layout['yaxis']['title'] = 'Price ($)'
-                    fig.update_layout(layout)
+                    fig = _moving_average_figure(symbol, start_date, end_date, indicators)
                     
                     st.plotly_chart(fig, use_container_width=True)
                     
-                    # Enhanced moving average analysis
-                    st.subheader("📊 Moving Average Signals")
-                    
-                    # Get the last values
-                    last_ma20 = df["MA20"].iloc[-1] if not pd.isna(df["MA20"].iloc[-1]) else 0
-                    last_ma50 = df["MA50"].iloc[-1] if not pd.isna(df["MA50"].iloc[-1]) else 0
-                    last_ma200 = df["MA200"].iloc[-1] if not pd.isna(df["MA200"].iloc[-1]) else 0
-                    last_close = df["Close"].iloc[-1]
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        ma20_signal = "🟢 Bullish" if last_close > last_ma20 else "🔴 Bearish"
-                        st.metric("MA20 Signal", ma20_signal, f"${last_ma20:.2f}")
-                    
-                    with col2:
-                        ma50_signal = "🟢 Bullish" if last_close > last_ma50 else "🔴 Bearish"
-                        st.metric("MA50 Signal", ma50_signal, f"${last_ma50:.2f}")
-                    
-                    with col3:
-                        ma200_signal = "🟢 Bullish" if last_close > last_ma200 else "🔴 Bearish"
-                        st.metric("MA200 Signal", ma200_signal, f"${last_ma200:.2f}")
-                    
-                    with col4:
-                        # Golden/Death Cross detection
-                        if last_ma50 > last_ma200:
-                            cross_signal = "🌟 Golden Cross"
-                    else:
-                            cross_signal = "💀 Death Cross"
-                        st.metric("Cross Signal", cross_signal)
-                    
-                    # Bollinger Bands analysis
-                    st.subheader("🎯 Bollinger Bands Analysis")
-                    bb_upper = df["BB_Upper"].iloc[-1]
-                    bb_lower = df["BB_Lower"].iloc[-1]
-                    bb_position = (last_close - bb_lower) / (bb_upper - bb_lower) * 100
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if bb_position > 80:
-                            bb_signal = "🔴 Overbought"
-                        elif bb_position < 20:
-                            bb_signal = "🟢 Oversold"
-                    else:
-                            bb_signal = "🟡 Neutral"
-                        st.metric("BB Signal", bb_signal, f"{bb_position:.1f}%")
-                    
-                    with col2:
-                        bb_width = ((bb_upper - bb_lower) / df["BB_Middle"].iloc[-1]) * 100
-                        volatility = "🔥 High" if bb_width > 10 else "❄️ Low"
-                        st.metric("Volatility", volatility, f"{bb_width:.1f}%")
-                
-                with tab3:
-                    st.subheader("Technical Oscillators")
-                    
-                    # Create enhanced subplots for oscillators
-                    fig = make_subplots(
-                        rows=2, cols=1, 
-                        shared_xaxes=True, 
-                        vertical_spacing=0.08, 
-                        row_heights=[0.5, 0.5],
-                        subplot_titles=('RSI (Relative Strength Index)', 'MACD (Moving Average Convergence Divergence)')
-                    )
-                    
-                    # Enhanced RSI with gradient fill
-                    fig.add_trace(
-                        go.Scatter(
-                            x=df["Date"], 
-                            y=df["RSI"], 
-                            name="RSI",
-                            line=dict(color=CHART_COLORS['purple'], width=2),
-                            fill='tonexty',
-                            fillcolor='rgba(139, 92, 246, 0.1)'
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    # Add RSI reference lines with enhanced styling
-                    fig.add_hline(y=70, line_dash="dash", line_color=CHART_COLORS['danger'], 
-                                 annotation_text="Overbought (70)", row=1, col=1)
-                    fig.add_hline(y=50, line_dash="dot", line_color=CHART_COLORS['text'], 
-                                 annotation_text="Neutral (50)", row=1, col=1)
-                    fig.add_hline(y=30, line_dash="dash", line_color=CHART_COLORS['success'], 
-                                 annotation_text="Oversold (30)", row=1, col=1)
-                    
-                    # Enhanced MACD with histogram colors
-                    histogram_colors = [CHART_COLORS['success'] if val >= 0 else CHART_COLORS['danger'] 
-                                       for val in df["Histogram"]]
-                    
-                    fig.add_trace(
-                        go.Bar(
-                            x=df["Date"], 
-                            y=df["Histogram"], 
-                            name="MACD Histogram",
-                            marker_color=histogram_colors,
-                            opacity=0.7
-                        ),
-                        row=2, col=1
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=df["Date"], 
-                            y=df["MACD"], 
-                            name="MACD Line",
-                            line=dict(color=CHART_COLORS['primary'], width=2)
-                        ),
-                        row=2, col=1
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=df["Date"], 
-                            y=df["Signal"], 
-                            name="Signal Line",
-                            line=dict(color=CHART_COLORS['warning'], width=2, dash='dash')
-                        ),
-                        row=2, col=1
-                    )
-                    
-                    # Add zero line for MACD
-                    fig.add_hline(y=0, line_dash="dot", line_color=CHART_COLORS['text'], 
-                                 annotation_text="Zero Line", row=2, col=1)
-                    
-                    # Enhanced layout for oscillators
-                    layout = get_enhanced_layout(f"{symbol} Technical Oscillators", 700)
-                    layout['yaxis']['title'] = 'RSI'
-                    layout['yaxis']['range'] = [0, 100]
-                    layout['yaxis2'] = {
-                        'title': 'MACD',
-                        'gridcolor': CHART_COLORS['grid'],
-                        'showgrid': True,
-                        'color': CHART_COLORS['text']
+                    # Pull the computed moving averages out of pandas once; the signals
+                    # and crossover scans below all read these arrays
+                    last_close = df["Close"].to_numpy()[-1]
+                    ma_arrays = {
+                        column: df[column].to_numpy()
+                        for column in ("MA20", "MA50", "MA200") if column in df.columns
                     }
+                    last_ma = {column: values[-1] if not np.isnan(values[-1]) else 0 for column, values in ma_arrays.items()}
                     
-                    fig.update_layout(layout)
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Enhanced oscillator analysis
-                    st.subheader("📊 Oscillator Signals")
-                    
-                    current_rsi = df["RSI"].iloc[-1] if not pd.isna(df["RSI"].iloc[-1]) else 50
-                    current_macd = df["MACD"].iloc[-1] if not pd.isna(df["MACD"].iloc[-1]) else 0
-                    current_signal = df["Signal"].iloc[-1] if not pd.isna(df["Signal"].iloc[-1]) else 0
-                    current_histogram = df["Histogram"].iloc[-1] if not pd.isna(df["Histogram"].iloc[-1]) else 0
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        if current_rsi > 70:
-                            rsi_signal = "🔴 Overbought"
-                        elif current_rsi < 30:
-                            rsi_signal = "🟢 Oversold"
-                        else:
-                            rsi_signal = "🟡 Neutral"
-                        st.metric("RSI Signal", rsi_signal, f"{current_rsi:.1f}")
-                    
-                    with col2:
-                        macd_signal = "🟢 Bullish" if current_macd > current_signal else "🔴 Bearish"
-                        st.metric("MACD Signal", macd_signal, f"{current_macd:.4f}")
-                    
-                    with col3:
-                        momentum = "🚀 Increasing" if current_histogram > 0 else "📉 Decreasing"
-                        st.metric("Momentum", momentum, f"{current_histogram:.4f}")
-                    
-                    with col4:
-                        # Divergence detection (simplified)
-                        price_trend = "📈 Up" if df["Close"].iloc[-1] > df["Close"].iloc[-10] else "📉 Down"
-                        st.metric("Price Trend", price_trend)
-                    
-                    # Update y-axis labels
-                    fig.update_yaxes(title_text="RSI", row=1, col=1)
-                    fig.update_yaxes(title_text="MACD", row=2, col=1)
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    if last_ma:
+                        # Enhanced moving average analysis
+                        st.subheader("📊 Moving Average Signals")
+                        
+                        metric_cols = st.columns(4)
+                        
+                        for metric_col, (column, last_value) in zip(metric_cols, last_ma.items()):
+                            with metric_col:
+                                ma_signal = "🟢 Bullish" if last_close > last_value else "🔴 Bearish"
+                                st.metric(f"{column} Signal", ma_signal, f"${last_value:.2f}")
+                        
+                        if "MA50" in last_ma and "MA200" in last_ma:
+                            with metric_cols[3]:
+                                # Golden/Death Cross detection: an actual MA50/MA200 cross in the
+                                # last 30 sessions, otherwise whichever average currently leads
+                                crossover = _recent_crossover(ma_arrays["MA50"], ma_arrays["MA200"], lookback=30)
+                                if crossover:
+                                    direction, days_ago = crossover
+                                    cross_signal = "🌟 Golden Cross" if direction == "Bullish" else "💀 Death Cross"
+                                    st.metric("Cross Signal", cross_signal, f"{days_ago} days ago", delta_color="off")
+                                else:
+                                    cross_signal = "🌟 Golden Cross" if last_ma["MA50"] > last_ma["MA200"] else "💀 Death Cross"
+                                    st.metric("Cross Signal", cross_signal)
+                        
+                        if "MA20" in last_ma and "MA50" in last_ma:
+                            # Short-term MA20/MA50 crossover over the same window
+                            crossover = _recent_crossover(ma_arrays["MA20"], ma_arrays["MA50"], lookback=30)
+                            if crossover:
+                                direction, days_ago = crossover
+                                st.caption(f"{direction} MA20/MA50 crossover {days_ago} days ago")
+                    
+                    if "BB_Upper" in df.columns:
+                        # Bollinger Bands analysis
+                        st.subheader("🎯 Bollinger Bands Analysis")
+                        bb_upper = df["BB_Upper"].iat[-1]
+                        bb_lower = df["BB_Lower"].iat[-1]
+                        bb_position = (last_close - bb_lower) / (bb_upper - bb_lower) * 100
+                        
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            if bb_position > 80:
+                                bb_signal = "🔴 Overbought"
+                            elif bb_position < 20:
+                                bb_signal = "🟢 Oversold"
+                            else:
+                                bb_signal = "🟡 Neutral"
+                            st.metric("BB Signal", bb_signal, f"{bb_position:.1f}%")
+                        
+                        with col2:
+                            bb_width = ((bb_upper - bb_lower) / df["BB_Middle"].iat[-1]) * 100
+                            volatility = "🔥 High" if bb_width > 10 else "❄️ Low"
+                            st.metric("Volatility", volatility, f"{bb_width:.1f}%")
+                
+                elif active_view == TECHNICAL_VIEWS[2]:
+                    with st.spinner("Calculating indicators..."):
+                        df = _compute_indicators(symbol, start_date, end_date, indicators)
                     
-                    # Oscillator analysis
-                    st.subheader("Oscillator Analysis")
+                    st.subheader("Technical Oscillators")
                     
-                    # Get latest RSI and MACD values
-                    last_rsi = df["RSI"].iloc[-1]
-                    last_macd = df["MACD"].iloc[-1]
-                    last_signal = df["Signal"].iloc[-1]
+                    show_rsi = "RSI" in df.columns
+                    show_macd = "MACD" in df.columns
                     
-                    # RSI analysis
-                    if last_rsi > 70:
-                        rsi_status = "Overbought"
-                    elif last_rsi < 30:
-                        rsi_status = "Oversold"
-                    else:
-                        rsi_status = "Neutral"
+                    # Pull the columns used below out of pandas once
+                    close_arr = df["Close"].to_numpy()
+                    rsi_arr = df["RSI"].to_numpy() if show_rsi else None
+                    macd_arr = df["MACD"].to_numpy() if show_macd else None
+                    sig_arr = df["Signal"].to_numpy() if show_macd else None
+                    hist_arr = df["Histogram"].to_numpy() if show_macd else None
                     
-                    # MACD analysis
-                    if last_macd > last_signal:
-                        macd_status = "Bullish"
+                    if not (show_rsi or show_macd):
+                        st.info("Enable RSI or MACD in the sidebar to view oscillator analysis.")
                     else:
-                        macd_status = "Bearish"
-                    
-                    # Check for recent MACD crossover
-                    macd_crossover = "No recent crossover"
-                    for i in range(1, min(10, len(df))):
-                        prev_macd = df["MACD"].iloc[-i-1]
-                        prev_signal = df["Signal"].iloc[-i-1]
-                        curr_macd = df["MACD"].iloc[-i]
-                        curr_signal = df["Signal"].iloc[-i]
+                        fig = _oscillator_figure(symbol, start_date, end_date, indicators)
                         
-                        if (prev_macd < prev_signal and curr_macd > curr_signal):
-                            macd_crossover = f"Bullish crossover detected {i} days ago"
-                            break
-                        elif (prev_macd > prev_signal and curr_macd < curr_signal):
-                            macd_crossover = f"Bearish crossover detected {i} days ago"
-                            break
-                    
-                    st.write(f"**RSI (14):** {last_rsi:.2f} - {rsi_status}")
-                    st.write(f"**MACD:** {macd_status} ({macd_crossover})")
+                        st.plotly_chart(fig, use_container_width=True)
+                        
+                        # Signal metrics and written analysis
+                        _oscillator_signals(close_arr, rsi_arr, macd_arr, sig_arr, hist_arr)
+                        _oscillator_analysis(rsi_arr, macd_arr, sig_arr)
                 
-                with tab4:
+                else:
                     st.subheader("Advanced Technical Analysis")
                     
-                    # Run the technical analysis agent to get advanced indicators and patterns
-                    tech_analysis_agent = TechnicalAnalysisAgent()
+                    # Latest close shared by the interpretations below
+                    last_close = df["Close"].to_numpy()[-1]
                     
+                    # Price line arrays shared by the Bollinger, Ichimoku and Fibonacci charts
+                    price_xy = _line_xy(date_arr, df["Close"])
+                    
+                    # Run the technical analysis agent to get advanced indicators and patterns
                     with st.spinner("Calculating advanced indicators and detecting patterns..."):
-                        analysis_result = asyncio.run(tech_analysis_agent.run({
-                            "symbol": symbol,
-                            "indicators": ["bollinger", "ichimoku", "atr", "stochastic", "psar", "fibonacci", "patterns"],
-                            "period": 200  # Need more data for reliable pattern detection
-                        }))
+                        analysis_result = _tech_analysis_result(
+                            symbol, 
+                            200,  # Need more data for reliable pattern detection
+                            ("bollinger", "ichimoku", "atr", "stochastic", "psar", "fibonacci", "patterns")
+                        )
                     
                     if analysis_result["status"] == "success":
                         analysis_data = analysis_result["data"]
+                        indicator_data = analysis_data["indicators"]
                         
                         # Create subtabs for advanced analysis
                         adv_tab1, adv_tab2, adv_tab3 = st.tabs(["Advanced Indicators", "Patterns", "Fibonacci"])
@@ -779,56 +1376,13 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                             st.subheader("Advanced Technical Indicators")
                             
                             # Bollinger Bands
-                            if "bollinger" in analysis_data["indicators"]:
-                                bb_data = analysis_data["indicators"]["bollinger"]
+                            if "bollinger" in indicator_data:
+                                bb_data = indicator_data["bollinger"]
                                 st.write("**Bollinger Bands**")
                                 
-                                # Create a figure with Bollinger Bands
-                                fig = go.Figure()
-                                
-                                # Add price line
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=df["Close"], 
-                                    name="Price",
-                                    line=dict(color='blue')
-                                ))
-                                
-                                # Add Bollinger Bands
-                                # We need to calculate them for the entire period
-                                from src.utils.advanced_indicators import calculate_bollinger_bands
-                                bb_df = calculate_bollinger_bands(df.copy())
-                                
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=bb_df["bb_high"], 
-                                    name="Upper Band",
-                                    line=dict(color='red', dash='dash')
-                                ))
-                                
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=bb_df["bb_mid"], 
-                                    name="Middle Band",
-                                    line=dict(color='green', dash='dash')
-                                ))
+                                fig = _bollinger_figure(symbol, start_date, end_date)
                                 
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=bb_df["bb_low"], 
-                                    name="Lower Band",
-                                    line=dict(color='red', dash='dash')
-                                ))
-                                
-                                # Update layout
-                                fig.update_layout(
-                                    title=f"{symbol} Bollinger Bands",
-                                    xaxis_title="Date",
-                                    yaxis_title="Price ($)",
-                                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                                )
-                                
-                                st.plotly_chart(fig, use_container_width=True)
+                                st.plotly_chart(fig, use_container_width=True, key=f"bb_{symbol}")
                                 
                                 # Display current values
                                 col1, col2, col3 = st.columns(3)
@@ -839,86 +1393,33 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                                 with col3:
                                     st.metric("Lower Band", f"${bb_data['lower_band']:.2f}")
                                 
-                                st.write(f"**Bandwidth:** {bb_data['width']:.2f}")
-                                st.write(f"**%B:** {bb_data['percent_b']:.2f}")
+                                percent_b = bb_data['percent_b']
+                                st.markdown(f"**Bandwidth:** {bb_data['width']:.2f}  \n**%B:** {percent_b:.2f}")
                                 
                                 # Interpretation
                                 st.subheader("Bollinger Bands Interpretation")
                                 
-                                if bb_data['percent_b'] > 1:
+                                if percent_b > 1:
                                     st.warning("Price is above the upper band, suggesting overbought conditions.")
-                                elif bb_data['percent_b'] < 0:
+                                elif percent_b < 0:
                                     st.warning("Price is below the lower band, suggesting oversold conditions.")
-                                elif bb_data['percent_b'] > 0.8:
+                                elif percent_b > 0.8:
                                     st.info("Price is approaching the upper band, suggesting strong momentum.")
-                                elif bb_data['percent_b'] < 0.2:
+                                elif percent_b < 0.2:
                                     st.info("Price is approaching the lower band, suggesting weak momentum.")
                                 else:
                                     st.success("Price is within the bands, suggesting neutral trading conditions.")
                             
                             # Ichimoku Cloud
-                            if "ichimoku" in analysis_data["indicators"]:
+                            if "ichimoku" in indicator_data:
                                 st.write("---")
                                 st.write("**Ichimoku Cloud**")
                                 
-                                ichimoku_data = analysis_data["indicators"]["ichimoku"]
-                                
-                                # Create a figure with Ichimoku Cloud
-                                fig = go.Figure()
-                                
-                                # Add price line
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=df["Close"], 
-                                    name="Price",
-                                    line=dict(color='black')
-                                ))
-                                
-                                # Calculate Ichimoku components for the entire period
-                                from src.utils.advanced_indicators import calculate_ichimoku_cloud
-                                ichi_df = calculate_ichimoku_cloud(df.copy())
-                                
-                                # Add Ichimoku components
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=ichi_df["ichimoku_conversion_line"], 
-                                    name="Conversion Line (Tenkan-sen)",
-                                    line=dict(color='blue')
-                                ))
-                                
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=ichi_df["ichimoku_base_line"], 
-                                    name="Base Line (Kijun-sen)",
-                                    line=dict(color='red')
-                                ))
-                                
-                                # Add the cloud
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=ichi_df["ichimoku_a"], 
-                                    name="Leading Span A (Senkou Span A)",
-                                    line=dict(color='green', width=0.5)
-                                ))
-                                
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=ichi_df["ichimoku_b"], 
-                                    name="Leading Span B (Senkou Span B)",
-                                    line=dict(color='red', width=0.5),
-                                    fill='tonexty', 
-                                    fillcolor='rgba(0, 250, 0, 0.1)'
-                                ))
+                                ichimoku_data = indicator_data["ichimoku"]
                                 
-                                # Update layout
-                                fig.update_layout(
-                                    title=f"{symbol} Ichimoku Cloud",
-                                    xaxis_title="Date",
-                                    yaxis_title="Price ($)",
-                                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                                )
+                                fig = _ichimoku_figure(symbol, start_date, end_date)
                                 
-                                st.plotly_chart(fig, use_container_width=True)
+                                st.plotly_chart(fig, use_container_width=True, key=f"ichimoku_{symbol}")
                                 
                                 # Display current values
                                 col1, col2 = st.columns(2)
@@ -932,19 +1433,24 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                                 # Interpretation
                                 st.subheader("Ichimoku Cloud Interpretation")
                                 
-                                if df["Close"].iloc[-1] > max(ichimoku_data['senkou_span_a'], ichimoku_data['senkou_span_b']):
+                                span_a = ichimoku_data['senkou_span_a']
+                                span_b = ichimoku_data['senkou_span_b']
+                                tenkan_sen = ichimoku_data['tenkan_sen']
+                                kijun_sen = ichimoku_data['kijun_sen']
+                                
+                                if last_close > max(span_a, span_b):
                                     st.success("Price is above the cloud, suggesting a bullish trend.")
-                                elif df["Close"].iloc[-1] < min(ichimoku_data['senkou_span_a'], ichimoku_data['senkou_span_b']):
+                                elif last_close < min(span_a, span_b):
                                     st.error("Price is below the cloud, suggesting a bearish trend.")
                                 else:
                                     st.warning("Price is within the cloud, suggesting a neutral or transitioning market.")
                                 
-                                if ichimoku_data['tenkan_sen'] > ichimoku_data['kijun_sen']:
+                                if tenkan_sen > kijun_sen:
                                     st.success("Conversion line is above base line, indicating bullish momentum.")
-                                elif ichimoku_data['tenkan_sen'] < ichimoku_data['kijun_sen']:
+                                elif tenkan_sen < kijun_sen:
                                     st.error("Conversion line is below base line, indicating bearish momentum.")
                                 
-                                if ichimoku_data['senkou_span_a'] > ichimoku_data['senkou_span_b']:
+                                if span_a > span_b:
                                     st.success("Leading Span A is above Leading Span B, creating a bullish cloud.")
                                 else:
                                     st.error("Leading Span A is below Leading Span B, creating a bearish cloud.")
@@ -956,35 +1462,36 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                             col1, col2 = st.columns(2)
                             
                             # Average True Range (ATR)
-                            if "atr" in analysis_data["indicators"]:
-                                atr_value = analysis_data["indicators"]["atr"]["atr_14"]
+                            if "atr" in indicator_data:
+                                atr_value = indicator_data["atr"]["atr_14"]
                                 with col1:
                                     st.metric("ATR (14)", f"{atr_value:.2f}")
-                                    st.write(f"The Average True Range indicates the level of volatility. Higher values (>{atr_value/df['Close'].iloc[-1]*100:.2f}% of price) suggest higher volatility.")
+                                    st.write(f"The Average True Range indicates the level of volatility. Higher values (>{atr_value/last_close*100:.2f}% of price) suggest higher volatility.")
                             
                             # Stochastic Oscillator
-                            if "stochastic" in analysis_data["indicators"]:
-                                stoch_data = analysis_data["indicators"]["stochastic"]
+                            if "stochastic" in indicator_data:
+                                stoch_data = indicator_data["stochastic"]
+                                stoch_k = stoch_data['k_value']
+                                stoch_d = stoch_data['d_value']
                                 with col2:
-                                    st.metric("Stochastic K", f"{stoch_data['k_value']:.2f}")
-                                    st.metric("Stochastic D", f"{stoch_data['d_value']:.2f}")
+                                    st.metric("Stochastic K", f"{stoch_k:.2f}")
+                                    st.metric("Stochastic D", f"{stoch_d:.2f}")
                                     
-                                    if stoch_data['k_value'] > 80:
+                                    if stoch_k > 80:
                                         st.error("Stochastic is in overbought territory.")
-                                    elif stoch_data['k_value'] < 20:
+                                    elif stoch_k < 20:
                                         st.success("Stochastic is in oversold territory.")
                                     
-                                    if stoch_data['k_value'] > stoch_data['d_value']:
+                                    if stoch_k > stoch_d:
                                         st.success("Stochastic K is above D, suggesting bullish momentum.")
                                     else:
                                         st.error("Stochastic K is below D, suggesting bearish momentum.")
                             
                             # Parabolic SAR
-                            if "psar" in analysis_data["indicators"]:
-                                psar_data = analysis_data["indicators"]["psar"]
+                            if "psar" in indicator_data:
+                                psar_data = indicator_data["psar"]
                                 st.write("---")
-                                st.write(f"**Parabolic SAR:** {psar_data['psar_value']:.2f}")
-                                st.write(f"**Trend (PSAR):** {psar_data['trend']}")
+                                st.markdown(f"**Parabolic SAR:** {psar_data['psar_value']:.2f}  \n**Trend (PSAR):** {psar_data['trend']}")
                                 
                                 if psar_data['trend'] == "Uptrend":
                                     st.success("Parabolic SAR indicates an uptrend.")
@@ -1000,57 +1507,18 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                                 if patterns.get("summary", {}).get("detected_count", 0) > 0:
                                     st.success(f"Detected {patterns['summary']['detected_count']} patterns!")
                                     
-                                    # Head and Shoulders
-                                    if "head_and_shoulders" in patterns:
-                                        hs_pattern = patterns["head_and_shoulders"]
-                                        if hs_pattern.get("detected", False):
-                                            st.write("---")
-                                            pattern_type = hs_pattern.get("pattern_type", "")
-                                            if pattern_type == "head_and_shoulders":
-                                                st.warning("**Head and Shoulders Pattern Detected**")
-                                                st.write("This is typically a bearish reversal pattern suggesting a potential downtrend.")
-                                            elif pattern_type == "inverse_head_and_shoulders":
-                                                st.success("**Inverse Head and Shoulders Pattern Detected**")
-                                                st.write("This is typically a bullish reversal pattern suggesting a potential uptrend.")
-                                    
-                                    # Double Top/Bottom
-                                    if "double_pattern" in patterns:
-                                        double_pattern = patterns["double_pattern"]
-                                        if double_pattern.get("detected", False):
-                                            st.write("---")
-                                            pattern_type = double_pattern.get("pattern_type", "")
-                                            if pattern_type == "double_top":
-                                                st.warning("**Double Top Pattern Detected**")
-                                                st.write("This is typically a bearish reversal pattern suggesting a potential downtrend.")
-                                            elif pattern_type == "double_bottom":
-                                                st.success("**Double Bottom Pattern Detected**")
-                                                st.write("This is typically a bullish reversal pattern suggesting a potential uptrend.")
-                                    
-                                    # Cup and Handle
-                                    if "cup_and_handle" in patterns:
-                                        cup_pattern = patterns["cup_and_handle"]
-                                        if cup_pattern.get("detected", False):
-                                            st.write("---")
-                                            st.success("**Cup and Handle Pattern Detected**")
-                                            st.write("This is typically a bullish continuation pattern suggesting a potential uptrend continuation.")
-                                    
-                                    # Flag/Pennant
-                                    if "flag_pennant" in patterns:
-                                        flag_pattern = patterns["flag_pennant"]
-                                        if flag_pattern.get("detected", False):
-                                            st.write("---")
-                                            pattern_type = flag_pattern.get("pattern_type", "")
-                                            direction = flag_pattern.get("direction", "")
-                                            
-                                            if pattern_type == "flag":
-                                                st.write(f"**{direction.capitalize()} Flag Pattern Detected**")
-                                            elif pattern_type == "pennant":
-                                                st.write(f"**{direction.capitalize()} Pennant Pattern Detected**")
-                                            
-                                            if direction == "bullish":
-                                                st.success("This is typically a bullish continuation pattern suggesting a potential uptrend continuation.")
-                                            else:
-                                                st.warning("This is typically a bearish continuation pattern suggesting a potential downtrend continuation.")
+                                    for key, field, messages in PATTERN_MESSAGES:
+                                        pattern = patterns.get(key, {})
+                                        if not pattern.get("detected", False):
+                                            continue
+                                        
+                                        st.write("---")
+                                        message = messages.get(pattern.get(field, "") if field else None)
+                                        if message:
+                                            level, title, description = message
+                                            kind = pattern.get("pattern_type", "").capitalize()
+                                            getattr(st, level)(f"**{title.format(kind=kind)}**")
+                                            st.write(description)
                                 else:
                                     st.info("No significant chart patterns detected in the current time frame.")
                                     st.write("Chart patterns often require specific market conditions and may not be present at all times.")
@@ -1060,28 +1528,25 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                         with adv_tab3:
                             st.subheader("Fibonacci Retracement Levels")
                             
-                            if "fibonacci" in analysis_data["indicators"]:
-                                fib_levels = analysis_data["indicators"]["fibonacci"]
+                            if "fibonacci" in indicator_data:
+                                fib_levels = indicator_data["fibonacci"]
                                 
                                 # Create a figure with Fibonacci levels
                                 fig = go.Figure()
                                 
                                 # Add price line
-                                fig.add_trace(go.Scatter(
-                                    x=df["Date"], 
-                                    y=df["Close"], 
-                                    name="Price",
-                                    line=dict(color='blue')
-                                ))
+                                fig.add_trace(_price_trace(price_xy, 'blue'))
                                 
-                                # Add Fibonacci levels as horizontal lines
+                                # Fibonacci levels as horizontal lines with labels, set on the layout in one call
                                 colors = ['purple', 'red', 'orange', 'green', 'cyan', 'blue', 'magenta']
-                                for i, (level_name, level_value) in enumerate(fib_levels.items()):
-                                    fig.add_shape(
+                                date_first = int(date_arr[0])
+                                date_last = int(date_arr[-1])
+                                fib_shapes = [
+                                    dict(
                                         type="line",
-                                        x0=df["Date"].iloc[0],
+                                        x0=date_first,
                                         y0=level_value,
-                                        x1=df["Date"].iloc[-1],
+                                        x1=date_last,
                                         y1=level_value,
                                         line=dict(
                                             color=colors[i % len(colors)],
@@ -1089,31 +1554,40 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                                             dash="dash",
                                         )
                                     )
-                                    
-                                    # Add annotations for the levels
-                                    fig.add_annotation(
-                                        x=df["Date"].iloc[-1],
+                                    for i, level_value in enumerate(fib_levels.values())
+                                ]
+                                fib_annotations = [
+                                    dict(
+                                        x=date_last,
                                         y=level_value,
                                         text=f"{level_name}: ${level_value:.2f}",
                                         showarrow=False,
                                         xshift=100,
                                         align="left"
                                     )
+                                    for level_name, level_value in fib_levels.items()
+                                ]
                                 
                                 # Update layout
                                 fig.update_layout(
                                     title=f"{symbol} Fibonacci Retracement Levels",
                                     xaxis_title="Date",
+                                    xaxis_type="date",
                                     yaxis_title="Price ($)",
-                                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                                    shapes=fib_shapes,
+                                    annotations=fib_annotations,
+                                    uirevision=symbol
                                 )
                                 
-                                st.plotly_chart(fig, use_container_width=True)
+                                st.plotly_chart(fig, use_container_width=True, key=f"fib_{symbol}")
                                 
-                                # Display Fibonacci levels
+                                # Display Fibonacci levels as one table instead of a write per level
                                 st.write("**Fibonacci Retracement Levels:**")
-                                for level_name, level_value in fib_levels.items():
-                                    st.write(f"**{level_name}:** ${level_value:.2f}")
+                                st.table(pd.DataFrame(
+                                    {"Price": [f"${level_value:.2f}" for level_value in fib_levels.values()]},
+                                    index=pd.Index(list(fib_levels), name="Level")
+                                ))
                                 
                                 # Interpretation
                                 st.subheader("Fibonacci Level Interpretation")
@@ -1126,14 +1600,13 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                                 """)
                                 
                                 # Current price in relation to Fibonacci levels
-                                current_price = df["Close"].iloc[-1]
-                                for i, (level_name, level_value) in enumerate(sorted(fib_levels.items(), key=lambda x: float(x[1]))):
-                                    if current_price > level_value:
-                                        if i < len(fib_levels) - 1:
-                                            next_level_name = list(sorted(fib_levels.items(), key=lambda x: float(x[1])))[i+1][0]
-                                            next_level_value = list(sorted(fib_levels.items(), key=lambda x: float(x[1])))[i+1][1]
-                                            st.write(f"Current price (${current_price:.2f}) is between {level_name} (${level_value:.2f}) and {next_level_name} (${next_level_value:.2f}).")
-                                            break
+                                current_price = last_close
+                                sorted_levels = sorted(fib_levels.items(), key=lambda x: float(x[1]))
+                                bracket = bisect.bisect_left([float(value) for _, value in sorted_levels], current_price)
+                                if 0 < bracket < len(sorted_levels):
+                                    level_name, level_value = sorted_levels[bracket - 1]
+                                    next_level_name, next_level_value = sorted_levels[bracket]
+                                    st.write(f"Current price (${current_price:.2f}) is between {level_name} (${level_value:.2f}) and {next_level_name} (${next_level_value:.2f}).")
                             else:
                                 st.error("Fibonacci analysis data not available.")
                     else:
@@ -1142,29 +1615,19 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                 # Add overall analysis and recommendations
                 st.subheader("Technical Analysis Summary")
                 
-                # Run technical analysis agent to get signals
-                tech_analysis_agent = TechnicalAnalysisAgent()
-                with st.spinner("Generating technical analysis summary..."):
-                    analysis_result = asyncio.run(tech_analysis_agent.run({
-                        "symbol": symbol,
-                        "indicators": ["sma", "ema", "rsi", "macd", "bollinger", "stochastic", "ichimoku"],
-                        "period": 100
-                    }))
+                # Use the summary fetched with the prices, re-running the agent only if that failed
+                if summary_data is not None:
+                    analysis_result = {"status": "success", "data": summary_data}
+                else:
+                    with st.spinner("Generating technical analysis summary..."):
+                        analysis_result = _tech_analysis_result(symbol, SUMMARY_PERIOD, SUMMARY_INDICATORS)
                 
                 if analysis_result["status"] == "success":
                     signals = analysis_result["data"]["signals"]
                     
                     # Display overall signal
                     overall_signal = signals.get("overall", {}).get("signal", "Neutral")
-                    signal_colors = {
-                        "Strong Buy": "green",
-                        "Buy": "lightgreen",
-                        "Neutral": "gray",
-                        "Sell": "lightcoral",
-                        "Strong Sell": "red"
-                    }
-                    
-                    signal_color = signal_colors.get(overall_signal, "gray")
+                    signal_color = SIGNAL_COLORS.get(overall_signal, "gray")
                     
                     st.markdown(f"<h3 style='color: {signal_color}'>Overall Signal: {overall_signal}</h3>", unsafe_allow_html=True)
                     
@@ -1185,50 +1648,15 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
                     st.write("**Individual Indicator Signals:**")
                     
                     # Create a DataFrame for indicator signals
-                    indicator_data = []
-                    
-                    if "moving_averages" in signals:
-                        ma_signal = signals["moving_averages"]["trend"]
-                        indicator_data.append(["Moving Averages", ma_signal])
-                    
-                    if "rsi" in signals:
-                        rsi_signal = signals["rsi"]["signal"]
-                        indicator_data.append(["RSI", rsi_signal])
-                    
-                    if "macd" in signals:
-                        macd_signal = signals["macd"]["signal"]
-                        indicator_data.append(["MACD", macd_signal])
-                    
-                    if "bollinger" in signals:
-                        bb_signal = signals["bollinger"]["signal"]
-                        indicator_data.append(["Bollinger Bands", bb_signal])
-                    
-                    if "stochastic" in signals:
-                        stoch_signal = signals["stochastic"]["signal"]
-                        indicator_data.append(["Stochastic", stoch_signal])
-                    
-                    if "ichimoku" in signals:
-                        ichi_signal = signals["ichimoku"]["signal"]
-                        indicator_data.append(["Ichimoku Cloud", ichi_signal])
-                    
-                    if "psar" in signals:
-                        psar_signal = signals["psar"]["signal"]
-                        indicator_data.append(["Parabolic SAR", psar_signal])
+                    indicator_data = [
+                        (name, signals[key][field])
+                        for key, field, name in INDICATOR_SIGNALS
+                        if key in signals
+                    ]
                     
                     if indicator_data:
-                        # Create a DataFrame and display it
-                        signal_df = pd.DataFrame(indicator_data, columns=["Indicator", "Signal"])
-                        
-                        # Apply color formatting based on signals
-                        def color_signal(val):
-                            if "Buy" in val:
-                                return "background-color: lightgreen"
-                            elif "Sell" in val:
-                                return "background-color: lightcoral"
-                            else:
-                                return "background-color: lightgray"
-                        
-                        st.dataframe(signal_df.style.applymap(color_signal, subset=["Signal"]), use_container_width=True)
+                        # Prebuilt HTML table so the colors need no pandas Styler pass
+                        st.markdown(_signal_table_html(indicator_data), unsafe_allow_html=True)
                 else:
                     st.error(f"Error generating signals: {analysis_result.get('message', 'Unknown error')}")
             else:
@@ -1236,23 +1664,35 @@ def render_technical_analysis(symbol, start_date, end_date, run_analysis):
     else:
         st.info("Click 'Run Analysis' to generate technical analysis for the selected symbol.")
 
+@st.cache_data(show_spinner=False)
+def _price_history_figure(symbol, date_ms, close):
+    """Plotly figure spec for the valuation tab's price history line"""
+    fig = go.Figure()
+    
+    # Add historical price line, WebGL-rendered and LTTB-downsampled like the technical charts
+    fig.add_trace(go.Scattergl(**_line_xy(date_ms, close), name="Price"))
+    
+    # Update layout
+    fig.update_layout(
+        title=f"{symbol} Price History",
+        xaxis_title="Date",
+        xaxis_type="date",
+        yaxis_title="Price ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig.to_dict()
+
 def render_fundamental_analysis(symbol, run_analysis):
     st.header(f"Fundamental Analysis for {symbol}")
     
     if run_analysis:
-        # Initialize the market data agent
-        market_data_agent = MarketDataAgent()
-        
         # Use st.spinner to show loading state
         with st.spinner(f"Fetching fundamental data for {symbol}..."):
-            # Run the agent to get market data
-            market_data = asyncio.run(market_data_agent.fetch_market_data(
-                symbol, 
-                interval="1d"
-            ))
-            
-            if "error" in market_data:
-                st.error(f"Error fetching data: {market_data['error']}")
+            # Get market data, cached across reruns
+            try:
+                market_data = _fetch_fundamentals(symbol)
+            except ValueError as e:
+                st.error(f"Error fetching data: {e}")
                 return
             
             # Create columns for key metrics
@@ -1290,14 +1730,15 @@ def render_fundamental_analysis(symbol, run_analysis):
                 st.metric("52-Week Low", low_display)
             
             # Fetch historical data for financial ratios over time
-            historical_data = pd.DataFrame(market_data.get("historical_data", []))
+            historical_data = _history_frame(market_data.get("historical_data", []))
             if not historical_data.empty:
                 # Ensure Date is datetime
-                if "Date" in historical_data.columns:
-                    historical_data["Date"] = pd.to_datetime(historical_data["Date"])
-                elif "Datetime" in historical_data.columns:
-                    historical_data["Date"] = pd.to_datetime(historical_data["Datetime"])
-                    historical_data = historical_data.rename(columns={"Datetime": "Date"})
+                historical_data = _parse_dates(historical_data)
+                
+                # Sort once and pull out the arrays the valuation chart and return figures read
+                historical_data = historical_data.sort_values("Date")
+                close_arr = historical_data["Close"].to_numpy()
+                date_ms = _date_ms(historical_data)
                 
                 # Create tabs for different analysis views
                 tab1, tab2, tab3 = st.tabs(["Key Ratios", "Valuation", "Financial Summary"])
@@ -1328,27 +1769,9 @@ def render_fundamental_analysis(symbol, run_analysis):
                     # Create dummy historical P/E data
                     # In a real implementation, you would fetch this from an API
                     if "Close" in historical_data.columns:
-                        # Get last year of data
-                        recent_data = historical_data.sort_values("Date").tail(252)  # ~1 year of trading days
-                        
-                        # Create a figure with P/E ratio over time (simulated)
-                        fig = go.Figure()
-                        
-                        # Add historical price line
-                        fig.add_trace(go.Scatter(
-                            x=recent_data["Date"], 
-                            y=recent_data["Close"],
-                            name="Price"
-                        ))
-                        
-                        # Update layout
-                        fig.update_layout(
-                            title=f"{symbol} Price History",
-                            xaxis_title="Date",
-                            yaxis_title="Price ($)",
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                        )
-                        
+                        # Price history figure over the last ~1 year of trading days,
+                        # cached on the plotted arrays
+                        fig = _price_history_figure(symbol, date_ms[-252:], close_arr[-252:])
                         st.plotly_chart(fig, use_container_width=True)
                     
                     # Peer comparison
@@ -1363,25 +1786,20 @@ def render_fundamental_analysis(symbol, run_analysis):
                         "Market Cap ($B)": [market_cap/1000000000 if market_cap else 0, 250, 180, 120, 200]
                     }
                     
+                    # Keep the columns numeric and let the Styler format them per column
                     peer_df = pd.DataFrame(peer_data)
-                    st.table(peer_df)
+                    st.table(peer_df.style.format(PEER_TABLE_FORMATS))
                 
                 with tab3:
                     st.subheader("Financial Summary")
                     
                     # Financial summary
-                    if "Close" in historical_data.columns and len(historical_data) >= 252:
+                    if "Close" in historical_data.columns and len(close_arr) >= 252:
                         # Calculate yearly performance
-                        recent_year = historical_data.sort_values("Date").tail(252)
-                        start_price = recent_year["Close"].iloc[0]
-                        end_price = recent_year["Close"].iloc[-1]
-                        yearly_return = ((end_price / start_price) - 1) * 100
+                        yearly_return = ((close_arr[-1] / close_arr[-252]) - 1) * 100
                         
-                        # Calculate 3-month performance
-                        recent_quarter = historical_data.sort_values("Date").tail(63)  # ~3 months
-                        start_price_q = recent_quarter["Close"].iloc[0]
-                        end_price_q = recent_quarter["Close"].iloc[-1]
-                        quarter_return = ((end_price_q / start_price_q) - 1) * 100
+                        # Calculate 3-month performance (~63 trading days)
+                        quarter_return = ((close_arr[-1] / close_arr[-63]) - 1) * 100
                         
                         # Display performance metrics
                         col1, col2 = st.columns(2)
@@ -1398,20 +1816,65 @@ def render_fundamental_analysis(symbol, run_analysis):
     else:
         st.info("Click 'Run Analysis' to generate fundamental analysis for the selected symbol.")
 
+def _article_markdown(article):
+    """Markdown entry for one news article: title, source, score and link"""
+    return (
+        f"**{article.get('title', 'No Title')}**  \n"
+        f"Source: {article.get('source', 'Unknown')} | Score: {article.get('sentiment_score', 0):.2f}  \n"
+        f"[Read More]({article.get('url', '#')})"
+    )
+
+@st.cache_data(show_spinner=False)
+def _sentiment_gauge_figure(symbol, sentiment_score):
+    """Plotly figure spec for the sentiment score gauge"""
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = sentiment_score,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': f"Sentiment Score for {symbol}"},
+        gauge = {
+            'axis': {'range': [-1, 1]},
+            'bar': {'color': "darkblue"},
+            'steps' : [
+                {'range': [-1, -0.3], 'color': "red"},
+                {'range': [-0.3, 0.3], 'color': "gray"},
+                {'range': [0.3, 1], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': sentiment_score
+            }
+        }
+    ))
+    
+    fig.update_layout(height=250)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def _sentiment_pie_figure(labels, values):
+    """Plotly figure spec for the sentiment distribution pie"""
+    fig = go.Figure(data=[go.Pie(
+        labels=labels, 
+        values=values,
+        hole=.3,
+        marker_colors=['green', 'gray', 'red']
+    )])
+    
+    fig.update_layout(height=300)
+    return fig.to_dict()
+
 def render_sentiment_analysis(symbol, run_analysis):
     st.header(f"Sentiment Analysis for {symbol}")
     
     if run_analysis:
-        # Initialize the news sentiment agent
-        news_agent = NewsSentimentAgent()
-        
         # Use st.spinner to show loading state
         with st.spinner(f"Analyzing news sentiment for {symbol}..."):
-            # Run the agent to get sentiment data
-            sentiment_data = asyncio.run(news_agent.process(f"What is the sentiment for {symbol} this week?"))
-            
-            if sentiment_data.get("status") == "error":
-                st.error(f"Error analyzing sentiment: {sentiment_data.get('message', 'Unknown error')}")
+            # Get sentiment data, cached across reruns
+            try:
+                sentiment_data = _fetch_sentiment(symbol)
+            except ValueError as e:
+                st.error(f"Error analyzing sentiment: {e}")
                 return
             
             sentiment_results = sentiment_data.get("data", {})
@@ -1427,30 +1890,8 @@ def render_sentiment_analysis(symbol, run_analysis):
                     overall_sentiment = sentiment_results.get("overall_sentiment", "neutral")
                     sentiment_score = sentiment_results.get("sentiment_score", 0)
                     
-                    # Create a gauge chart for sentiment score
-                    fig = go.Figure(go.Indicator(
-                        mode = "gauge+number",
-                        value = sentiment_score,
-                        domain = {'x': [0, 1], 'y': [0, 1]},
-                        title = {'text': f"Sentiment Score for {symbol}"},
-                        gauge = {
-                            'axis': {'range': [-1, 1]},
-                            'bar': {'color': "darkblue"},
-                            'steps' : [
-                                {'range': [-1, -0.3], 'color': "red"},
-                                {'range': [-0.3, 0.3], 'color': "gray"},
-                                {'range': [0.3, 1], 'color': "green"}
-                            ],
-                            'threshold': {
-                                'line': {'color': "red", 'width': 4},
-                                'thickness': 0.75,
-                                'value': sentiment_score
-                            }
-                        }
-                    ))
-                    
-                    fig.update_layout(height=250)
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Gauge chart for sentiment score
+                    st.plotly_chart(_sentiment_gauge_figure(symbol, sentiment_score), use_container_width=True)
                     
                     # Sentiment distribution
                     st.subheader("Sentiment Distribution")
@@ -1462,15 +1903,7 @@ def render_sentiment_analysis(symbol, run_analysis):
                     values = list(sentiment_dist.values())
                     
                     if sum(values) > 0:
-                        fig = go.Figure(data=[go.Pie(
-                            labels=labels, 
-                            values=values,
-                            hole=.3,
-                            marker_colors=['green', 'gray', 'red']
-                        )])
-                        
-                        fig.update_layout(height=300)
-                        st.plotly_chart(fig, use_container_width=True)
+                        st.plotly_chart(_sentiment_pie_figure(tuple(labels), tuple(values)), use_container_width=True)
                     else:
                         st.info("No sentiment distribution data available.")
                     
@@ -1494,38 +1927,17 @@ def render_sentiment_analysis(symbol, run_analysis):
                     articles = sentiment_results.get("articles", [])
                     
                     if articles:
-                        # Group articles by sentiment
-                        positive_articles = [a for a in articles if a.get("sentiment") == "positive"]
-                        neutral_articles = [a for a in articles if a.get("sentiment") == "neutral"]
-                        negative_articles = [a for a in articles if a.get("sentiment") == "negative"]
-                        
-                        # Create expandable sections for each sentiment category
-                        with st.expander(f"Positive Articles ({len(positive_articles)})", expanded=True):
-                            for article in positive_articles:
-                                st.markdown(f"""
-                                **{article.get('title', 'No Title')}**  
-                                Source: {article.get('source', 'Unknown')} | Score: {article.get('sentiment_score', 0):.2f}  
-                                [Read More]({article.get('url', '#')})
-                                """)
-                                st.divider()
+                        # Group articles by sentiment in a single pass
+                        articles_by_sentiment = defaultdict(list)
+                        for article in articles:
+                            articles_by_sentiment[article.get("sentiment")].append(article)
                         
-                        with st.expander(f"Neutral Articles ({len(neutral_articles)})"):
-                            for article in neutral_articles:
-                                st.markdown(f"""
-                                **{article.get('title', 'No Title')}**  
-                                Source: {article.get('source', 'Unknown')} | Score: {article.get('sentiment_score', 0):.2f}  
-                                [Read More]({article.get('url', '#')})
-                                """)
-                                st.divider()
-                        
-                        with st.expander(f"Negative Articles ({len(negative_articles)})"):
-                            for article in negative_articles:
-                                st.markdown(f"""
-                                **{article.get('title', 'No Title')}**  
-                                Source: {article.get('source', 'Unknown')} | Score: {article.get('sentiment_score', 0):.2f}  
-                                [Read More]({article.get('url', '#')})
-                                """)
-                                st.divider()
+                        # One markdown block per sentiment section, articles separated by rules
+                        for label, sentiment, expanded in SENTIMENT_SECTIONS:
+                            section_articles = articles_by_sentiment[sentiment]
+                            with st.expander(f"{label} Articles ({len(section_articles)})", expanded=expanded):
+                                if section_articles:
+                                    st.markdown("\n\n---\n\n".join(_article_markdown(article) for article in section_articles))
                     else:
                         st.info(f"No news articles found for {symbol}.")
             else:
@@ -1533,6 +1945,94 @@ def render_sentiment_analysis(symbol, run_analysis):
     else:
         st.info("Click 'Run Analysis' to generate sentiment analysis for the selected symbol.")
 
+@st.cache_data(show_spinner=False)
+def _synthetic_volatility(symbol):
+    """Placeholder market and stock volatility series seeded by the symbol"""
+    # crc32 rather than hash() so the series is stable across processes
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    dates = pd.date_range(start="2022-01-01", end="2023-01-01", freq="B")
+    market_volatility = rng.normal(15, 3, size=len(dates))
+    stock_volatility = market_volatility * 1.2 + rng.normal(0, 2, size=len(dates))
+    
+    # Ensure volatility is positive
+    market_volatility = np.abs(market_volatility)
+    stock_volatility = np.abs(stock_volatility)
+    
+    # Apply some smoothing
+    market_volatility = _centered_moving_average(market_volatility, 20)
+    stock_volatility = _centered_moving_average(stock_volatility, 20)
+    return dates, market_volatility, stock_volatility
+
+@st.cache_data(show_spinner=False)
+def _volatility_figures(symbol):
+    """Plotly figure specs for the volatility comparison and distribution charts"""
+    # Dummy volatility data, generated once per symbol; float32 is plenty for display
+    dates, market_volatility, stock_volatility = _synthetic_volatility(symbol)
+    market_volatility = market_volatility.astype(np.float32)
+    stock_volatility = stock_volatility.astype(np.float32)
+    
+    # Create volatility chart
+    comparison_fig = go.Figure()
+    comparison_fig.add_trace(go.Scatter(x=dates, y=stock_volatility, name=f"{symbol} Volatility"))
+    comparison_fig.add_trace(go.Scatter(x=dates, y=market_volatility, name="Market Volatility", line=dict(dash='dash')))
+    
+    comparison_fig.update_layout(
+        title="Historical Volatility Comparison",
+        xaxis_title="Date",
+        yaxis_title="Volatility (%)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    # Volatility distribution
+    distribution_fig = go.Figure()
+    distribution_fig.add_trace(go.Histogram(x=stock_volatility, name=f"{symbol} Volatility", opacity=0.7))
+    distribution_fig.add_trace(go.Histogram(x=market_volatility, name="Market Volatility", opacity=0.7))
+    
+    distribution_fig.update_layout(
+        title="Volatility Distribution",
+        xaxis_title="Volatility (%)",
+        yaxis_title="Frequency",
+        barmode='overlay',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return comparison_fig.to_dict(), distribution_fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def _correlation_figure(symbol):
+    """Plotly figure spec for the placeholder correlation heatmap"""
+    assets = [symbol] + PEER_ASSETS
+    fig = go.Figure(data=go.Heatmap(
+        z=PEER_CORRELATION,
+        x=assets,
+        y=assets,
+        colorscale='RdBu_r',
+        zmin=-1,
+        zmax=1
+    ))
+    
+    fig.update_layout(
+        title="Correlation Matrix",
+        height=400
+    )
+    return fig.to_dict()
+
+@st.fragment
+def _allocation_impact():
+    """Render the allocation slider and its portfolio impact as an isolated fragment"""
+    # Portfolio allocation input
+    st.write("Adjust the allocation to see the impact on portfolio risk:")
+    allocation = st.slider("Allocation (%)", min_value=0, max_value=100, value=10, step=5)
+    
+    # Portfolio impact metrics
+    st.subheader(f"Impact of {allocation}% Allocation")
+    
+    # Every impact scales linearly with the allocation
+    impacts = ALLOCATION_IMPACTS["Rate"].to_numpy() * allocation
+    st.table(pd.DataFrame({
+        "Metric": ALLOCATION_IMPACTS.index,
+        "Impact": [f"+{impact:.2f}{unit}" for impact, unit in zip(impacts, ALLOCATION_IMPACTS["Unit"])]
+    }).set_index("Metric"))
+
 def render_risk_analysis(symbol, run_analysis):
     st.header(f"Risk Analysis for {symbol}")
     
@@ -1543,32 +2043,8 @@ def render_risk_analysis(symbol, run_analysis):
         with tab1:
             st.subheader("Key Risk Metrics")
             
-            # Risk metrics table
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                metrics1 = {
-                    "Beta": "1.23",
-                    "Alpha (1Y)": "5.67%",
-                    "R-Squared": "0.85",
-                    "Sharpe Ratio": "1.45",
-                    "Treynor Ratio": "8.92"
-                }
-                
-                for metric, value in metrics1.items():
-                    st.metric(label=metric, value=value)
-            
-            with col2:
-                metrics2 = {
-                    "Standard Deviation (1Y)": "22.4%",
-                    "Max Drawdown (1Y)": "-18.3%",
-                    "VaR (95%, 1D)": "-2.8%",
-                    "Sortino Ratio": "1.82",
-                    "Information Ratio": "0.76"
-                }
-                
-                for metric, value in metrics2.items():
-                    st.metric(label=metric, value=value)
+            # Risk metrics table, rendered as one element
+            st.table(RISK_METRICS)
             
             # Risk assessment
             st.subheader("Risk Assessment")
@@ -1581,95 +2057,18 @@ def render_risk_analysis(symbol, run_analysis):
         with tab2:
             st.subheader("Volatility Analysis")
             
-            # Generate dummy data for volatility
-            dates = pd.date_range(start="2022-01-01", end="2023-01-01", freq="B")
-            market_volatility = np.random.normal(15, 3, size=len(dates))
-            stock_volatility = market_volatility * 1.2 + np.random.normal(0, 2, size=len(dates))
-            
-            # Ensure volatility is positive
-            market_volatility = np.abs(market_volatility)
-            stock_volatility = np.abs(stock_volatility)
-            
-            # Apply some smoothing
-            market_volatility = np.convolve(market_volatility, np.ones(20)/20, mode='same')
-            stock_volatility = np.convolve(stock_volatility, np.ones(20)/20, mode='same')
-            
-            # Create volatility chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=dates, y=stock_volatility, name=f"{symbol} Volatility"))
-            fig.add_trace(go.Scatter(x=dates, y=market_volatility, name="Market Volatility", line=dict(dash='dash')))
-            
-            fig.update_layout(
-                title="Historical Volatility Comparison",
-                xaxis_title="Date",
-                yaxis_title="Volatility (%)",
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Volatility distribution
-            fig = go.Figure()
-            fig.add_trace(go.Histogram(x=stock_volatility, name=f"{symbol} Volatility", opacity=0.7))
-            fig.add_trace(go.Histogram(x=market_volatility, name="Market Volatility", opacity=0.7))
-            
-            fig.update_layout(
-                title="Volatility Distribution",
-                xaxis_title="Volatility (%)",
-                yaxis_title="Frequency",
-                barmode='overlay',
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            # Volatility comparison and distribution charts from the dummy series
+            comparison_fig, distribution_fig = _volatility_figures(symbol)
+            st.plotly_chart(comparison_fig, use_container_width=True)
+            st.plotly_chart(distribution_fig, use_container_width=True)
         
         with tab3:
             st.subheader("Portfolio Impact Analysis")
             
-            # Portfolio allocation input
-            st.write("Adjust the allocation to see the impact on portfolio risk:")
-            allocation = st.slider("Allocation (%)", min_value=0, max_value=100, value=10, step=5)
-            
-            # Generate correlation matrix
-            assets = [symbol, "MSFT", "GOOGL", "AMZN", "META", "SPY"]
-            
-            # Create a random correlation matrix (for demonstration)
-            np.random.seed(42)
-            corr_matrix = np.random.uniform(0.3, 0.9, size=(len(assets), len(assets)))
-            np.fill_diagonal(corr_matrix, 1.0)
-            corr_matrix = (corr_matrix + corr_matrix.T) / 2  # Make it symmetric
-            
-            # Convert to DataFrame for display
-            corr_df = pd.DataFrame(corr_matrix, columns=assets, index=assets)
-            
             # Display correlation matrix as heatmap
-            fig = go.Figure(data=go.Heatmap(
-                z=corr_matrix,
-                x=assets,
-                y=assets,
-                colorscale='RdBu_r',
-                zmin=-1,
-                zmax=1
-            ))
-            
-            fig.update_layout(
-                title="Correlation Matrix",
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_correlation_figure(symbol), use_container_width=True)
             
-            # Portfolio impact metrics
-            st.subheader(f"Impact of {allocation}% Allocation")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.metric(label="Portfolio Beta Change", value=f"+{0.02 * allocation:.2f}")
-                st.metric(label="Expected Return Impact", value=f"+{0.05 * allocation:.2f}%")
-            
-            with col2:
-                st.metric(label="Volatility Impact", value=f"+{0.03 * allocation:.2f}%")
-                st.metric(label="Sharpe Ratio Impact", value=f"+{0.01 * allocation:.2f}")
+            # Slider moves rerun only the allocation fragment
+            _allocation_impact()
     else:
         st.info("Click 'Run Analysis' to generate risk analysis for the selected symbol.") 
\ No newline at end of file
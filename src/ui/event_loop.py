@@ -0,0 +1,11 @@
+"""Per-session asyncio event loop shared by the Streamlit pages"""
+
+import asyncio
+
+import streamlit as st
+
+def run_async(coro):
+    """Run a coroutine on this session's persistent event loop"""
+    if "event_loop" not in st.session_state or st.session_state.event_loop.is_closed():
+        st.session_state.event_loop = asyncio.new_event_loop()
+    return st.session_state.event_loop.run_until_complete(coro)
@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import asyncio
 from datetime import datetime, timedelta
 
-from src.agents.insider_trading_agent import InsiderTradingAgent
-from src.ui.insider_trading_ui import display_insider_trading_ui
+from src.ui.insider_trading_ui import display_insider_trading_ui, get_insider_agent
+from src.ui.event_loop import run_async
 
 def render_insider_trading():
     st.title("Insider Trading Monitor")
@@ -35,13 +34,13 @@ def render_insider_trading():
         
         # Main content
         if run_analysis:
-            # Initialize the insider trading agent
-            insider_agent = InsiderTradingAgent()
+            # Shared insider trading agent
+            insider_agent = get_insider_agent()
             
             # Use st.spinner to show loading state
             with st.spinner(f"Fetching insider trading data for {symbol}..."):
                 # Run the agent to get insider trading data and analysis
-                result = asyncio.run(insider_agent.run({
+                result = run_async(insider_agent.run({
                     "symbol": symbol,
                     "lookback_days": lookback_days
                 }))
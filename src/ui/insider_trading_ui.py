@@ -6,6 +6,15 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import json
 
+from src.agents.insider_trading_agent import InsiderTradingAgent
+from src.ui.event_loop import run_async
+from src.ui.shared_agents import without_history
+
+@st.cache_resource
+def get_insider_agent():
+    """Shared insider trading agent reused across reruns"""
+    return without_history(InsiderTradingAgent())
+
 def display_insider_trading_ui():
     """Display the insider trading analysis UI"""
     st.title("Insider Trading Analysis")
@@ -40,13 +49,8 @@ def display_insider_trading_ui():
         with st.spinner("Analyzing insider trading activities..."):
             # Use session state to store the data
             if analyze_btn or 'insider_data' not in st.session_state:
-                # This is where we would call the InsiderTradingAgent in a real implementation
-                from src.agents.insider_trading_agent import InsiderTradingAgent
-                import asyncio
-                
-                # Create agent and run analysis
-                agent = InsiderTradingAgent()
-                result = asyncio.run(agent.run({"symbol": symbol, "lookback_days": lookback_days}))
+                # Run the shared agent's analysis
+                result = run_async(get_insider_agent().run({"symbol": symbol, "lookback_days": lookback_days}))
                 
                 if result["status"] == "success":
                     st.session_state.insider_data = result["data"]
@@ -3,11 +3,12 @@ import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import numpy as np
-import asyncio
 
 # Import the agents for real data
-from src.agents.market_data_agent import MarketDataAgent
 from src.agents.insider_trading_agent import InsiderTradingAgent
+from src.ui.event_loop import run_async
+from src.ui.shared_agents import get_market_data_agent
+from src.utils.indicator_kernels import compute_rsi_wilder, rolling_mean
 
 def render_reports():
     st.title("Investment Reports")
@@ -66,7 +67,7 @@ def render_portfolio_report(generate_report, start_date, end_date):
         
         async def fetch_portfolio_data():
             # Initialize market data agent
-            market_agent = MarketDataAgent()
+            market_agent = get_market_data_agent()
             
             # Fetch real market data for portfolio stocks
             portfolio_data = {}
@@ -93,7 +94,7 @@ def render_portfolio_report(generate_report, start_date, end_date):
             return portfolio_data, total_portfolio_value
         
         with st.spinner("Fetching real market data for portfolio analysis..."):
-            portfolio_data, total_portfolio_value = asyncio.run(fetch_portfolio_data())
+            portfolio_data, total_portfolio_value = run_async(fetch_portfolio_data())
         
         # Portfolio overview
         st.subheader("Portfolio Overview")
@@ -190,7 +191,7 @@ def render_portfolio_report(generate_report, start_date, end_date):
         st.subheader("Portfolio Performance")
         
         async def fetch_benchmark_and_calculate_performance():
-            market_agent = MarketDataAgent()
+            market_agent = get_market_data_agent()
             
             # Get historical data for SPY as benchmark
             benchmark_data = await market_agent.fetch_market_data(
@@ -242,7 +243,7 @@ def render_portfolio_report(generate_report, start_date, end_date):
             
             return dates, portfolio_values, benchmark_values
         
-        dates, portfolio_values, benchmark_values = asyncio.run(fetch_benchmark_and_calculate_performance())
+        dates, portfolio_values, benchmark_values = run_async(fetch_benchmark_and_calculate_performance())
         
         # Create the performance chart
         if dates and portfolio_values:
@@ -290,7 +291,7 @@ def render_market_report(generate_report, start_date, end_date):
     if generate_report:
         async def fetch_market_data():
             # Initialize market data agent
-            market_agent = MarketDataAgent()
+            market_agent = get_market_data_agent()
             
             # Fetch real data for major indices
             indices = ["SPY", "QQQ", "DIA", "VIX"]  # S&P 500, Nasdaq, Dow, VIX
@@ -311,7 +312,7 @@ def render_market_report(generate_report, start_date, end_date):
             return market_agent, index_data
         
         with st.spinner("Fetching real market data for market analysis..."):
-            market_agent, index_data = asyncio.run(fetch_market_data())
+            market_agent, index_data = run_async(fetch_market_data())
         
         # Market overview with real data
         st.subheader("Market Overview")
@@ -389,7 +390,7 @@ def render_market_report(generate_report, start_date, end_date):
             return sector_performance
         
         with st.spinner("Fetching sector ETF data..."):
-            sector_performance = asyncio.run(fetch_sector_data())
+            sector_performance = run_async(fetch_sector_data())
         
         # Sort sectors by performance
         sorted_sectors = dict(sorted(sector_performance.items(), key=lambda x: x[1], reverse=True))
@@ -503,7 +504,7 @@ def render_stock_report(generate_report, start_date, end_date):
     if generate_report and symbol:
         async def fetch_stock_data():
             # Initialize market data agent
-            market_agent = MarketDataAgent()
+            market_agent = get_market_data_agent()
             
             try:
                 # Fetch real market data for the stock
@@ -522,7 +523,7 @@ def render_stock_report(generate_report, start_date, end_date):
                 return None, f"Error fetching data for {symbol}: {str(e)}"
         
         with st.spinner(f"Fetching real market data for {symbol.upper()}..."):
-            stock_data, error = asyncio.run(fetch_stock_data())
+            stock_data, error = run_async(fetch_stock_data())
         
         if error:
             st.error(error)
@@ -584,38 +585,45 @@ def render_stock_report(generate_report, start_date, end_date):
             # Convert historical data to pandas DataFrame
             df = pd.DataFrame(hist_data)
             
-            # Ensure Date column is datetime
-            if "Date" in df.columns:
-                df["Date"] = pd.to_datetime(df["Date"])
-            elif "Datetime" in df.columns:
-                df["Date"] = pd.to_datetime(df["Datetime"])
+            # Ensure Date column is datetime, parsing only when it is not already
+            if "Date" not in df.columns and "Datetime" in df.columns:
                 df = df.rename(columns={"Datetime": "Date"})
+            if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+                df["Date"] = pd.to_datetime(df["Date"], format="ISO8601", cache=True)
+            
+            # Extract the date and close arrays once and share them across every trace;
+            # tz-aware dates are made naive so they convert to datetime64, not objects
+            dates = df["Date"]
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_localize(None)
+            date_arr = dates.to_numpy()
+            close_arr = df["Close"].to_numpy()
             
             # Create the price chart
             fig = go.Figure()
             
             # Add price line
             fig.add_trace(go.Scatter(
-                x=df["Date"], 
-                y=df["Close"], 
+                x=date_arr, 
+                y=close_arr, 
                 name="Price", 
                 line=dict(color='#4285F4')
             ))
             
             # Add moving averages if we have enough data points
             if len(df) >= 20:
-                ma_20 = df["Close"].rolling(window=20).mean()
+                ma_20 = rolling_mean(close_arr, 20)
                 fig.add_trace(go.Scatter(
-                    x=df["Date"], 
+                    x=date_arr, 
                     y=ma_20, 
                     name="20-Day MA", 
                     line=dict(color='#34A853', dash='dot')
                 ))
             
             if len(df) >= 50:
-                ma_50 = df["Close"].rolling(window=50).mean()
+                ma_50 = rolling_mean(close_arr, 50)
                 fig.add_trace(go.Scatter(
-                    x=df["Date"], 
+                    x=date_arr, 
                     y=ma_50, 
                     name="50-Day MA", 
                     line=dict(color='#EA4335', dash='dot')
@@ -635,8 +643,8 @@ def render_stock_report(generate_report, start_date, end_date):
             
             vol_fig = go.Figure()
             vol_fig.add_trace(go.Bar(
-                x=df["Date"],
-                y=df["Volume"],
+                x=date_arr,
+                y=df["Volume"].to_numpy(),
                 name="Volume",
                 marker_color='#9E9E9E'
             ))
@@ -710,28 +718,9 @@ def render_stock_report(generate_report, start_date, end_date):
         st.subheader("Technical Analysis")
         
         if hist_data and len(hist_data) > 14:
-            # Calculate RSI
-            closes = [day.get("Close", 0) for day in hist_data[-14:]]
-            gains = []
-            losses = []
-            
-            for i in range(1, len(closes)):
-                change = closes[i] - closes[i-1]
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-            
-            avg_gain = np.mean(gains) if gains else 0
-            avg_loss = np.mean(losses) if losses else 0
-            
-            if avg_loss > 0:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            else:
-                rsi = 100
+            # Calculate the 14-day Wilder RSI over the full history
+            closes = np.array([day.get("Close", 0) for day in hist_data], dtype=np.float64)
+            rsi = compute_rsi_wilder(closes, 14)[-1]
             
             rsi_signal = "Oversold" if rsi < 30 else "Overbought" if rsi > 70 else "Neutral"
         else:
@@ -0,0 +1,18 @@
+"""Agent instances shared by every Streamlit page and session"""
+
+import streamlit as st
+
+from src.agents.market_data_agent import MarketDataAgent
+
+def without_history(agent):
+    """Stop a process-wide agent from keeping a message history that grows with every call"""
+    agent.state.keep_messages = False
+    return agent
+
+@st.cache_resource
+def get_market_data_agent():
+    """Single market data agent so all pages share one price cache"""
+    agent = without_history(MarketDataAgent())
+    # Expire quotes no later than the pages' 5-minute st.cache_data wrappers do
+    agent.state.cache_duration = 300
+    return agent
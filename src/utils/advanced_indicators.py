@@ -2,28 +2,118 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Union, Any
 import ta
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.trend import IchimokuIndicator, PSARIndicator, MACD
+from ta.volatility import AverageTrueRange
+from ta.trend import PSARIndicator, MACD
 from ta.momentum import RSIIndicator, StochasticOscillator
 import scipy.signal as signal
 
+from src.utils.indicator_cache import array_digest, memoized_indicator
+from src.utils.indicator_kernels import rolling_mean, slide_window_stats
+from src.utils.numba_compat import njit
+
+@njit(cache=True)
+def _bb_core(close, window, window_dev):
+    """Rolling mean and population std bands via a sliding Welford update"""
+    n = close.shape[0]
+    mavg = np.full(n, np.nan)
+    hband = np.full(n, np.nan)
+    lband = np.full(n, np.nan)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        # NaN closes are skipped, and only windows of valid closes are reported
+        count, mean, m2 = slide_window_stats(close[i], close[i - window] if i >= window else np.nan, count, mean, m2)
+        if count == window:
+            std = np.sqrt(max(m2 / window, 0.0))
+            mavg[i] = mean
+            hband[i] = mean + window_dev * std
+            lband[i] = mean - window_dev * std
+    return mavg, hband, lband
+
+@njit(cache=True)
+def _rolling_max_min(high, low, window, min_periods):
+    """Rolling max of high and min of low using monotonic index deques (O(N))"""
+    n = high.shape[0]
+    roll_max = np.full(n, np.nan)
+    roll_min = np.full(n, np.nan)
+    # Indices only move forward, so each deque is a slice of a length-n buffer
+    max_q = np.empty(n, dtype=np.int64)
+    min_q = np.empty(n, dtype=np.int64)
+    max_head = 0
+    max_tail = 0
+    min_head = 0
+    min_tail = 0
+    for i in range(n):
+        while max_tail > max_head and high[max_q[max_tail - 1]] <= high[i]:
+            max_tail -= 1
+        max_q[max_tail] = i
+        max_tail += 1
+        while min_tail > min_head and low[min_q[min_tail - 1]] >= low[i]:
+            min_tail -= 1
+        min_q[min_tail] = i
+        min_tail += 1
+
+        # Drop indices that slid out of the window
+        start = i - window + 1
+        if max_q[max_head] < start:
+            max_head += 1
+        if min_q[min_head] < start:
+            min_head += 1
+
+        if min(i + 1, window) >= min_periods:
+            roll_max[i] = high[max_q[max_head]]
+            roll_min[i] = low[min_q[min_head]]
+    return roll_max, roll_min
+
+@njit(cache=True)
+def _ichimoku_core(high, low, window1, window2, window3):
+    """Tenkan-sen, Kijun-sen and Senkou spans A/B (unshifted)"""
+    max1, min1 = _rolling_max_min(high, low, window1, window1)
+    max2, min2 = _rolling_max_min(high, low, window2, window2)
+    max3, min3 = _rolling_max_min(high, low, window3, 1)
+    conversion = 0.5 * (max1 + min1)
+    base = 0.5 * (max2 + min2)
+    span_a = 0.5 * (conversion + base)
+    span_b = 0.5 * (max3 + min3)
+    return conversion, base, span_a, span_b
+
+def bollinger_band_arrays(close: np.ndarray, window: int = 20, window_dev: int = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger middle, upper and lower bands as arrays, without building a DataFrame"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    return memoized_indicator(
+        ("bollinger", array_digest(close), window, window_dev),
+        lambda: _bb_core(close, window, float(window_dev))
+    )
+
+def ichimoku_arrays(high: np.ndarray, low: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Ichimoku conversion, base and unshifted leading spans A/B as arrays"""
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    return memoized_indicator(
+        ("ichimoku", array_digest(high, low), 9, 26, 52),
+        lambda: _ichimoku_core(high, low, 9, 26, 52)
+    )
+
 def calculate_bollinger_bands(df: pd.DataFrame, window: int = 20, window_dev: int = 2) -> pd.DataFrame:
     """Calculate Bollinger Bands"""
-    indicator_bb = BollingerBands(close=df["Close"], window=window, window_dev=window_dev)
-    df['bb_high'] = indicator_bb.bollinger_hband()
-    df['bb_mid'] = indicator_bb.bollinger_mavg()
-    df['bb_low'] = indicator_bb.bollinger_lband()
-    df['bb_width'] = indicator_bb.bollinger_wband()
-    df['bb_pct_b'] = indicator_bb.bollinger_pband()
+    close = np.ascontiguousarray(df["Close"].to_numpy(), dtype=np.float64)
+    mavg, hband, lband = bollinger_band_arrays(close, window, window_dev)
+    band_range = hband - lband
+    df['bb_high'] = hband
+    df['bb_mid'] = mavg
+    df['bb_low'] = lband
+    df['bb_width'] = band_range / mavg * 100
+    df['bb_pct_b'] = (close - lband) / np.where(band_range != 0, band_range, np.nan)
     return df
 
 def calculate_ichimoku_cloud(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate Ichimoku Cloud indicator"""
-    indicator_ichi = IchimokuIndicator(high=df["High"], low=df["Low"])
-    df['ichimoku_a'] = indicator_ichi.ichimoku_a()  # Senkou Span A
-    df['ichimoku_b'] = indicator_ichi.ichimoku_b()  # Senkou Span B
-    df['ichimoku_conversion_line'] = indicator_ichi.ichimoku_conversion_line()  # Tenkan-sen
-    df['ichimoku_base_line'] = indicator_ichi.ichimoku_base_line()  # Kijun-sen
+    conversion, base, span_a, span_b = ichimoku_arrays(df["High"].to_numpy(), df["Low"].to_numpy())
+    df['ichimoku_a'] = span_a  # Senkou Span A
+    df['ichimoku_b'] = span_b  # Senkou Span B
+    df['ichimoku_conversion_line'] = conversion  # Tenkan-sen
+    df['ichimoku_base_line'] = base  # Kijun-sen
     df['ichimoku_lagging_line'] = df['Close'].shift(-26)  # Chikou Span
     return df
 
@@ -54,9 +144,8 @@ def calculate_parabolic_sar(df: pd.DataFrame, step: float = 0.02, max_step: floa
 
 def calculate_fibonacci_levels(df: pd.DataFrame, period: int = 120) -> Dict[str, float]:
     """Calculate Fibonacci retracement levels based on recent high/low"""
-    recent_df = df.tail(period)
-    max_price = recent_df["High"].max()
-    min_price = recent_df["Low"].min()
+    max_price = np.nanmax(df["High"].to_numpy()[-period:])
+    min_price = np.nanmin(df["Low"].to_numpy()[-period:])
     diff = max_price - min_price
     
     # Fibonacci retracement levels: 0%, 23.6%, 38.2%, 50%, 61.8%, 78.6%, 100%
@@ -81,7 +170,7 @@ def detect_head_and_shoulders(df: pd.DataFrame, window: int = 20) -> Dict[str, U
     # We'll use scipy's find_peaks function
     try:
         # Smooth the data to reduce noise
-        smooth_close = df['Close'].rolling(window=5).mean().dropna().values
+        smooth_close = rolling_mean(df['Close'].to_numpy(), 5)[4:]
         
         # Find peaks (potential shoulders and head)
         peaks, _ = signal.find_peaks(smooth_close, distance=window)
@@ -162,7 +251,7 @@ def detect_double_top_bottom(df: pd.DataFrame, window: int = 20, threshold: floa
     """
     try:
         # Smooth the data to reduce noise
-        smooth_close = df['Close'].rolling(window=5).mean().dropna().values
+        smooth_close = rolling_mean(df['Close'].to_numpy(), 5)[4:]
         
         # Find peaks and troughs
         peaks, _ = signal.find_peaks(smooth_close, distance=window)
@@ -221,7 +310,7 @@ def detect_cup_and_handle(df: pd.DataFrame, window: int = 20) -> Dict[str, Union
             return {"detected": False, "reason": "insufficient_data"}
         
         # Smooth the data to reduce noise
-        smooth_close = df['Close'].rolling(window=5).mean().dropna().values
+        smooth_close = rolling_mean(df['Close'].to_numpy(), 5)[4:]
         
         # Find peaks and troughs
         peaks, _ = signal.find_peaks(smooth_close, distance=window)
@@ -291,8 +380,8 @@ def detect_flag_pennant(df: pd.DataFrame, window: int = 10) -> Dict[str, Union[b
             return {"detected": False, "reason": "insufficient_data"}
         
         # Check for a strong price move (pole)
-        recent_df = df.tail(20)
-        price_change = (recent_df['Close'].iloc[-1] - recent_df['Close'].iloc[0]) / recent_df['Close'].iloc[0]
+        pole = df['Close'].to_numpy()[-20:]
+        price_change = (pole[-1] - pole[0]) / pole[0]
         
         # Need at least 5% move for the pole
         if abs(price_change) < 0.05:
@@ -302,9 +391,10 @@ def detect_flag_pennant(df: pd.DataFrame, window: int = 10) -> Dict[str, Union[b
         is_bullish = price_change > 0
         
         # Last 5-10 bars should be consolidating (flag/pennant)
-        consolidation_df = df.tail(window)
-        consolidation_high = consolidation_df['High'].max()
-        consolidation_low = consolidation_df['Low'].min()
+        highs = df['High'].to_numpy()[-window:]
+        lows = df['Low'].to_numpy()[-window:]
+        consolidation_high = np.nanmax(highs)
+        consolidation_low = np.nanmin(lows)
         
         # Calculate the consolidation range as a percentage
         consolidation_range = (consolidation_high - consolidation_low) / consolidation_low
@@ -312,9 +402,6 @@ def detect_flag_pennant(df: pd.DataFrame, window: int = 10) -> Dict[str, Union[b
         # Flag/pennant should have a narrow range compared to the pole
         if consolidation_range < 0.5 * abs(price_change):
             # Check for converging trend lines (pennant) or parallel (flag)
-            highs = consolidation_df['High'].values
-            lows = consolidation_df['Low'].values
-            
             # Linear regression on highs and lows
             x = np.arange(len(highs))
             high_slope, _ = np.polyfit(x, highs, 1)
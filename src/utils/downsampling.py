@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.utils.numba_compat import njit
+
+@njit(cache=True)
+def _lttb_kernel(x, y, n_out):
+    """Largest-Triangle-Three-Buckets selection returning the kept indices"""
+    n = x.shape[0]
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+
+    bucket_size = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average point of the next bucket, ignoring NaN gaps
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        count = 0
+        for j in range(next_start, next_end):
+            if y[j] == y[j]:
+                avg_x += x[j]
+                avg_y += y[j]
+                count += 1
+        if count > 0:
+            avg_x /= count
+            avg_y /= count
+        else:
+            avg_x = x[next_end - 1]
+            avg_y = y[next_end - 1]
+
+        # Keep the point forming the largest triangle with the previous pick
+        ax = x[a]
+        ay = y[a]
+        max_area = -1.0
+        chosen = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        out[i + 1] = chosen
+        a = chosen
+    return out
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept when downsampling (x, y) to n_out points"""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        x = x.view(np.int64)
+    n = x.shape[0]
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    return _lttb_kernel(x.astype(np.float64), np.asarray(y, dtype=np.float64), n_out)
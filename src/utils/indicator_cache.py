@@ -0,0 +1,35 @@
+"""Bounded LRU of indicator output arrays keyed by input digest and parameters"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+
+INDICATOR_CACHE_SIZE = 64
+_INDICATOR_CACHE: "OrderedDict[tuple, Tuple[np.ndarray, ...]]" = OrderedDict()
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+def array_digest(*arrays: np.ndarray) -> bytes:
+    """Digest of the raw bytes of the given contiguous arrays"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(array)
+    return digest.digest()
+
+def memoized_indicator(key: tuple, compute) -> Tuple[np.ndarray, ...]:
+    """Return cached indicator arrays for key, computing and storing them on a miss"""
+    with _INDICATOR_CACHE_LOCK:
+        result = _INDICATOR_CACHE.get(key)
+        if result is not None:
+            _INDICATOR_CACHE.move_to_end(key)
+            return result
+    result = compute()
+    for array in result:
+        array.flags.writeable = False
+    with _INDICATOR_CACHE_LOCK:
+        _INDICATOR_CACHE[key] = result
+        while len(_INDICATOR_CACHE) > INDICATOR_CACHE_SIZE:
+            _INDICATOR_CACHE.popitem(last=False)
+    return result
@@ -0,0 +1,244 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Iterable
+
+from src.utils.indicator_cache import array_digest, memoized_indicator
+from src.utils.numba_compat import njit
+
+# Indicator flags understood by the fused kernel
+IND_SMA20 = 1
+IND_SMA50 = 2
+IND_SMA200 = 4
+IND_RSI = 8
+IND_EMA = 16
+IND_MACD = 32
+IND_BOLLINGER = 64
+
+INDICATOR_FLAGS = {
+    "sma20": IND_SMA20,
+    "sma50": IND_SMA50,
+    "sma200": IND_SMA200,
+    "rsi": IND_RSI,
+    "ema": IND_EMA,
+    "macd": IND_MACD,
+    "bollinger": IND_BOLLINGER,
+}
+
+# Column names produced by compute_price_indicators, in kernel output order,
+# paired with the flag that enables each one
+PRICE_INDICATOR_COLUMNS = (
+    ("MA20", IND_SMA20), ("MA50", IND_SMA50), ("MA200", IND_SMA200), ("RSI", IND_RSI),
+    ("EMA12", IND_EMA), ("EMA26", IND_EMA), ("MACD", IND_MACD), ("Signal", IND_MACD),
+    ("Histogram", IND_MACD), ("BB_Upper", IND_BOLLINGER), ("BB_Middle", IND_BOLLINGER),
+    ("BB_Lower", IND_BOLLINGER)
+)
+
+# Average loss below which an RSI window counts as loss-free
+RSI_FLAT_EPSILON = 1e-12
+
+@njit(cache=True)
+def _rsi_from_averages(avg_gain, avg_loss):
+    """RSI from Wilder average gain/loss; a window with no losses is 100 rather than inf/NaN"""
+    return 100.0 if avg_loss < RSI_FLAT_EPSILON else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+@njit(cache=True)
+def slide_window_stats(x, y, count, mean, m2):
+    """Welford step adding x to and dropping y from a window's (count, mean, M2); NaN values are skipped"""
+    if not np.isnan(y):
+        if count <= 1:
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+        else:
+            new_mean = mean - (y - mean) / (count - 1)
+            m2 -= (y - mean) * (y - new_mean)
+            mean = new_mean
+            count -= 1
+    if not np.isnan(x):
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+    return count, mean, m2
+
+@njit(cache=True)
+def _wilder_update(delta, count, avg_gain, avg_loss, period):
+    """Fold one price change into Wilder's average gain/loss; NaN changes are skipped"""
+    if np.isnan(delta):
+        return count, avg_gain, avg_loss
+    gain = max(delta, 0.0)
+    loss = max(-delta, 0.0)
+    count += 1
+    if count <= period:
+        # The first period changes seed simple averages
+        avg_gain += gain / period
+        avg_loss += loss / period
+    else:
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return count, avg_gain, avg_loss
+
+@njit(cache=True)
+def _ema_update(ema, old_weight, x, alpha):
+    """One adjust=False EMA step with pandas ewm NaN handling: a NaN decays the old weight and carries the value"""
+    if np.isnan(ema):
+        return x, 1.0
+    old_weight *= 1.0 - alpha
+    if not np.isnan(x):
+        ema = (old_weight * ema + alpha * x) / (old_weight + alpha)
+        old_weight = 1.0
+    return ema, old_weight
+
+@njit(cache=True, error_model="numpy")
+def _fused_price_indicators(close, flags):
+    """Single pass over close prices computing the indicators selected in flags"""
+    n = close.shape[0]
+    do_sma20 = (flags & IND_SMA20) != 0
+    do_sma50 = (flags & IND_SMA50) != 0
+    do_sma200 = (flags & IND_SMA200) != 0
+    do_rsi = (flags & IND_RSI) != 0
+    do_macd = (flags & IND_MACD) != 0
+    do_bb = (flags & IND_BOLLINGER) != 0
+    do_window20 = do_sma20 or do_bb
+    do_ema = do_macd or (flags & IND_EMA) != 0
+
+    # Disabled outputs get empty arrays so nothing is allocated for them
+    ma20 = np.full(n if do_window20 else 0, np.nan)
+    ma50 = np.full(n if do_sma50 else 0, np.nan)
+    ma200 = np.full(n if do_sma200 else 0, np.nan)
+    rsi = np.full(n if do_rsi else 0, np.nan)
+    ema12 = np.empty(n if do_ema else 0)
+    ema26 = np.empty(n if do_ema else 0)
+    macd = np.empty(n if do_macd else 0)
+    signal = np.empty(n if do_macd else 0)
+    hist = np.empty(n if do_macd else 0)
+    bb_upper = np.full(n if do_bb else 0, np.nan)
+    bb_lower = np.full(n if do_bb else 0, np.nan)
+
+    alpha12 = 2.0 / 13.0
+    alpha26 = 2.0 / 27.0
+    alpha9 = 2.0 / 10.0
+
+    count20 = 0
+    mean20 = 0.0
+    m2_20 = 0.0
+    # Window sums skip NaN closes; a window is reported only while it holds none
+    sum50 = 0.0
+    sum200 = 0.0
+    nan50 = 0
+    nan200 = 0
+    rsi_count = 0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    e12 = np.nan
+    e26 = np.nan
+    sig = np.nan
+    w12 = 1.0
+    w26 = 1.0
+    w_sig = 1.0
+
+    for i in range(n):
+        x = close[i]
+
+        # Sliding Welford update: the 20-window mean feeds SMA20 and the band
+        # centre, and M2 gives the band variance without a sum of squares; only
+        # windows of 20 valid closes are reported
+        if do_window20:
+            count20, mean20, m2_20 = slide_window_stats(x, close[i - 20] if i >= 20 else np.nan, count20, mean20, m2_20)
+            if count20 == 20:
+                ma20[i] = mean20
+                if do_bb:
+                    # Sample standard deviation (ddof=1) to match pandas rolling std
+                    std20 = np.sqrt(max(m2_20 / 19.0, 0.0))
+                    bb_upper[i] = mean20 + 2.0 * std20
+                    bb_lower[i] = mean20 - 2.0 * std20
+        x_nan = np.isnan(x)
+        if do_sma50:
+            if x_nan:
+                nan50 += 1
+            else:
+                sum50 += x
+            if i >= 50:
+                y = close[i - 50]
+                if np.isnan(y):
+                    nan50 -= 1
+                else:
+                    sum50 -= y
+            if i >= 49 and nan50 == 0:
+                ma50[i] = sum50 / 50.0
+        if do_sma200:
+            if x_nan:
+                nan200 += 1
+            else:
+                sum200 += x
+            if i >= 200:
+                y = close[i - 200]
+                if np.isnan(y):
+                    nan200 -= 1
+                else:
+                    sum200 -= y
+            if i >= 199 and nan200 == 0:
+                ma200[i] = sum200 / 200.0
+
+        # Wilder's RSI: the first 14 changes seed simple averages, after which
+        # each new gain/loss is smoothed in with alpha 1/14; changes touching a
+        # NaN close are skipped and the last RSI carries over them
+        if do_rsi and i > 0:
+            rsi_count, avg_gain, avg_loss = _wilder_update(x - close[i - 1], rsi_count, avg_gain, avg_loss, 14)
+            if rsi_count >= 14:
+                rsi[i] = _rsi_from_averages(avg_gain, avg_loss)
+
+        # MACD from 12/26 EMAs and a 9-period signal EMA (adjust=False), with
+        # NaN closes handled the way pandas ewm handles them
+        if do_ema:
+            e12, w12 = _ema_update(e12, w12, x, alpha12)
+            e26, w26 = _ema_update(e26, w26, x, alpha26)
+            ema12[i] = e12
+            ema26[i] = e26
+            if do_macd:
+                m = e12 - e26
+                sig, w_sig = _ema_update(sig, w_sig, m, alpha9)
+                macd[i] = m
+                signal[i] = sig
+                hist[i] = m - sig
+
+    return ma20, ma50, ma200, rsi, ema12, ema26, macd, signal, hist, bb_upper, ma20, bb_lower
+
+@njit(cache=True)
+def compute_rsi_wilder(close, period=14):
+    """Wilder RSI (RMA-smoothed gains/losses, as TA-Lib computes it); NaN until period valid changes are seen"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    count = 0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        # Changes touching a NaN close are skipped, so the last RSI carries over them
+        count, avg_gain, avg_loss = _wilder_update(close[i] - close[i - 1], count, avg_gain, avg_loss, period)
+        if count >= period:
+            out[i] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing simple moving average with a NaN prefix, like pandas rolling().mean()"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=-1)
+    return out
+
+def compute_price_indicators(close: np.ndarray, indicators: Iterable[str] = tuple(INDICATOR_FLAGS)) -> Dict[str, np.ndarray]:
+    """Compute the requested chart indicators for a close price series in one pass"""
+    flags = 0
+    for name in indicators:
+        flags |= INDICATOR_FLAGS.get(name, 0)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    outputs = memoized_indicator(
+        ("price", array_digest(close), flags),
+        lambda: _fused_price_indicators(close, flags)
+    )
+    return {
+        column: values
+        for (column, flag), values in zip(PRICE_INDICATOR_COLUMNS, outputs)
+        if flags & flag
+    }